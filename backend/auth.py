@@ -1,11 +1,20 @@
+import asyncio
+import hashlib
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
+import cache
 import models
 import schemas
 from database import get_db
@@ -13,10 +22,31 @@ from database import get_db
 # Configuration pour le hachage des mots de passe
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Nombre de calculs bcrypt simultanés (100 à 300 ms de CPU chacun). Ils tournent
+# dans un pool de threads dédié (bcrypt libère le GIL) : une rafale de connexions
+# attend ce pool sans bloquer la boucle d'événements ni occuper les threads de
+# FastAPI qui servent les autres routes. Par défaut, un cœur reste libre pour
+# la boucle d'événements.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 1) - 1))))
+
+_password_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
 # Configuration pour JWT
 SECRET_KEY = "YOUR_SECRET_KEY_HERE"  # En production, utilisez une clé secrète sécurisée
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Jetons de rafraîchissement : échangés contre un nouveau jeton d'accès sans mot de
+# passe, et remplacés à chaque échange (voir crud.rotate_refresh_token)
+REFRESH_TOKEN_EXPIRE_DAYS = 30
+# Délai pendant lequel un jeton qui vient d'être échangé peut l'être de nouveau
+# sans être pris pour un jeton volé : plusieurs onglets qui rafraîchissent en
+# même temps présentent le même jeton
+REFRESH_TOKEN_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_TOKEN_REUSE_GRACE_SECONDS", "30"))
+
+# Tickets des flux SSE : EventSource ne peut pas envoyer d'en-tête Authorization,
+# et le jeton d'accès ne doit pas apparaître dans une URL (journaux, historique).
+# Un ticket ouvre un seul flux, dans les secondes qui suivent sa création.
+STREAM_TICKET_EXPIRE_SECONDS = 30
 
 # Configuration pour OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -27,6 +57,15 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def _run_in_password_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_password_pool, func, *args)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await _run_in_password_pool(get_password_hash, password)
+
 def get_user(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
@@ -38,6 +77,18 @@ def authenticate_user(db: Session, username: str, password: str):
         return False
     return user
 
+async def authenticate(db: Session, username: str, password: str):
+    """
+    Comme authenticate_user, pour une route async : la requête SQL passe par le pool
+    de threads de FastAPI et la vérification du mot de passe par le pool bcrypt.
+    """
+    user = await run_in_threadpool(get_user, db, username)
+    if not user:
+        return False
+    if not await verify_password_async(password, user.hashed_password):
+        return False
+    return user
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -48,7 +99,45 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def _identity(user: models.User) -> dict:
+    return {column.key: getattr(user, column.key) for column in models.User.__table__.columns}
+
+def generate_refresh_token():
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str):
+    # Jeton aléatoire de 256 bits : SHA-256 suffit, sans le coût de bcrypt
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# Tickets en attente : ticket -> (utilisateur, échéance time.monotonic())
+_stream_tickets = {}
+_stream_tickets_lock = threading.Lock()
+
+def create_stream_ticket(user_id: int):
+    ticket = secrets.token_urlsafe(32)
+    now = time.monotonic()
+    with _stream_tickets_lock:
+        # Les tickets jamais utilisés sont supprimés à la création des suivants
+        for expired in [key for key, (_, expires_at) in _stream_tickets.items() if expires_at <= now]:
+            del _stream_tickets[expired]
+        _stream_tickets[ticket] = (user_id, now + STREAM_TICKET_EXPIRE_SECONDS)
+    return ticket
+
+def consume_stream_ticket(ticket: str) -> Optional[int]:
+    """
+    Identifiant de l'utilisateur d'un ticket de flux, ou None s'il est inconnu,
+    expiré ou déjà utilisé.
+    """
+    with _stream_tickets_lock:
+        entry = _stream_tickets.pop(ticket, None)
+    if entry is None or entry[1] <= time.monotonic():
+        return None
+    return entry[0]
+
+def get_user_from_token(token: str, db: Session):
+    """
+    Utilisateur d'un jeton d'accès (401 si le jeton est invalide ou expiré).
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -62,7 +151,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
+    key = ("identity", token_data.username)
+    identity = cache.identities.get(key)
+    if identity is not None:
+        # Objet détaché : seules ses colonnes (id, is_admin...) sont utilisables
+        return models.User(**identity)
+
+    generation = cache.identities.generation
     user = get_user(db, username=token_data.username)
     if user is None:
         raise credentials_exception
-    return user 
\ No newline at end of file
+    cache.identities.set(key, _identity(user), generation)
+    return user
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return get_user_from_token(token, db)
+
+async def get_current_admin_user(current_user: models.User = Depends(get_current_user)):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return current_user
@@ -0,0 +1,123 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Outils communs aux benchmarks (bench_concurrent_reads.py, bench_login.py) :
+# base de données temporaire, données de test, serveur de l'API lancé dans un
+# processus séparé et percentiles des latences.
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def create_database():
+    """
+    Crée une base de données vide dans un répertoire temporaire, qui devient le
+    répertoire courant (database.py y ouvre la base). Renvoie ce répertoire.
+    """
+    workdir = tempfile.mkdtemp(prefix="babyfoot-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+
+    import models
+    import migrations
+    from database import engine
+
+    models.Base.metadata.create_all(bind=engine)
+    migrations.run_migrations(engine)
+    return workdir
+
+def seed_tournament(db, teams_count: int):
+    """
+    Crée un tournoi démarré de teams_count équipes et renvoie son identifiant.
+    """
+    import crud
+    import models
+    import schemas
+
+    user = models.User(username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+
+    teams = [models.Team(name=f"Équipe {i}", owner_id=user.id) for i in range(teams_count)]
+    db.add_all(teams)
+    db.commit()
+
+    tournament = crud.create_tournament(
+        db, schemas.TournamentCreate(name="Benchmark", date="2024-01-01", max_teams=teams_count), user.id
+    )
+    tournament.teams.extend(teams)
+    db.commit()
+    crud.start_tournament(db, tournament.id)
+    return tournament.id
+
+def seed_users(db, users_count: int, password: str):
+    """
+    Crée les utilisateurs bench0, bench1... avec le mot de passe password.
+    """
+    import auth
+    import models
+
+    # Même empreinte pour tous : seul le coût de la vérification est mesuré
+    hashed_password = auth.get_password_hash(password)
+    db.add_all([
+        models.User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password=hashed_password)
+        for i in range(users_count)
+    ])
+    db.commit()
+
+def add_server_arguments(parser: argparse.ArgumentParser, port: int):
+    """
+    Options du serveur : port, et celles (cachées) du processus lancé par start_server.
+    """
+    parser.add_argument("--port", type=int, default=port)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+
+def serve(workdir: str, port: int, add_routes):
+    """
+    Lance l'API dans ce processus, avec les routes de comparaison ajoutées par
+    add_routes(app).
+    """
+    import uvicorn
+
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+    import main as api
+
+    add_routes(api.app)
+    uvicorn.run(api.app, host="127.0.0.1", port=port, log_level="warning")
+
+def start_server(script: str, workdir: str, port: int, env: dict):
+    """
+    Démarre le serveur (script --serve) dans un processus séparé pour que le
+    client de charge ne partage pas le GIL avec l'API mesurée. env complète les
+    variables d'environnement du serveur.
+    """
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(script), "--serve", "--workdir", workdir, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        env=dict(os.environ, **env),
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Le serveur de benchmark n'a pas démarré")
+
+def percentiles(latencies):
+    """
+    Médiane et 95e percentile (ms) de latences en secondes.
+    """
+    latencies = sorted(latencies)
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000,
+    }
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import time
+
+import bench_common
+
+# Benchmark du débit de requêtes GET concurrentes.
+# Compare l'ancien fonctionnement (route "async def" qui appelle la session
+# synchrone et bloque la boucle d'événements) avec la route de l'API, synchrone,
+# exécutée par FastAPI dans son pool de threads. Le cache des réponses est
+# désactivé dans le serveur : chaque requête lit la base.
+#
+# Utilisation (nécessite httpx) :
+#   python bench_concurrent_reads.py --requests 2000 --concurrency 50
+
+def add_blocking_route(app):
+    """
+    Ajoute une route qui reproduit l'ancien fonctionnement : la même lecture que
+    GET /api/tournaments/{id}, appelée directement depuis une route async.
+    """
+    from fastapi import Request
+
+    import main as api
+    from database import SessionLocal
+
+    @app.get("/bench/blocking/tournaments/{tournament_id}")
+    async def blocking_get_tournament(tournament_id: int, request: Request):
+        db = SessionLocal()
+        try:
+            return api.get_tournament(tournament_id, request, db)
+        finally:
+            db.close()
+
+async def run_load(url: str, total: int, concurrency: int):
+    import httpx
+
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker(client):
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        # Échauffement
+        await client.get(url)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {"rps": total / elapsed, **bench_common.percentiles(latencies)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de GET concurrents : route async bloquante vs route synchrone")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--teams", type=int, default=32)
+    bench_common.add_server_arguments(parser, port=8765)
+    args = parser.parse_args()
+
+    if args.serve:
+        bench_common.serve(args.workdir, args.port, add_blocking_route)
+        return
+
+    workdir = bench_common.create_database()
+    from database import SessionLocal
+
+    db = SessionLocal()
+    tournament_id = bench_common.seed_tournament(db, args.teams)
+    db.close()
+
+    # Cache des réponses désactivé (cache.py) : seul le chemin vers la base est mesuré
+    process = bench_common.start_server(__file__, workdir, args.port, {"RESPONSE_CACHE_TTL": "0"})
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        scenarios = [
+            ("avant (boucle bloquée)", f"{base_url}/bench/blocking/tournaments/{tournament_id}"),
+            ("après (pool de threads)", f"{base_url}/api/tournaments/{tournament_id}"),
+        ]
+
+        print(f"{args.requests} requêtes, {args.concurrency} clients simultanés, tournoi de {args.teams} équipes")
+        for label, url in scenarios:
+            result = asyncio.run(run_load(url, args.requests, args.concurrency))
+            print(f"{label:28s} {result['rps']:8.1f} req/s   p50 {result['p50']:7.1f} ms   p95 {result['p95']:7.1f} ms")
+    finally:
+        process.terminate()
+        process.wait()
+
+if __name__ == "__main__":
+    main()
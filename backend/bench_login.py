@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import time
+
+import bench_common
+
+# Benchmark des connexions concurrentes.
+# Compare l'ancien fonctionnement (bcrypt exécuté dans la boucle d'événements)
+# avec le pool bcrypt de auth.py : débit des connexions, et latence d'une route
+# de lecture appelée pendant la rafale de connexions.
+#
+# Utilisation (nécessite httpx) :
+#   python bench_login.py --logins 200 --concurrency 20
+
+PASSWORD = "password"
+READ_INTERVAL = 0.05
+
+def add_blocking_route(app):
+    """
+    Ajoute une route qui reproduit l'ancien fonctionnement : bcrypt dans la boucle d'événements.
+    """
+    from fastapi import Depends, HTTPException
+    from fastapi.security import OAuth2PasswordRequestForm
+    from sqlalchemy.orm import Session
+
+    import auth
+    from database import get_db
+
+    @app.post("/bench/blocking/login")
+    async def blocking_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+        user = auth.authenticate_user(db, form_data.username, form_data.password)
+        if not user:
+            raise HTTPException(status_code=401, detail="Incorrect username or password")
+        return {"access_token": auth.create_access_token(data={"sub": user.username}), "token_type": "bearer"}
+
+async def run_load(base_url: str, login_path: str, total: int, concurrency: int, users_count: int):
+    import httpx
+
+    login_latencies = []
+    read_latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(f"bench{i % users_count}")
+
+    async def login_worker(client):
+        while True:
+            try:
+                username = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await client.post(login_path, data={"username": username, "password": PASSWORD})
+            response.raise_for_status()
+            login_latencies.append(time.perf_counter() - start)
+
+    async def reader(client, done: asyncio.Event):
+        # Lecture légère toutes les READ_INTERVAL secondes pendant la rafale de connexions
+        while not done.is_set():
+            start = time.perf_counter()
+            response = await client.get("/api/users/check/bench0")
+            response.raise_for_status()
+            read_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(READ_INTERVAL)
+
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        # Échauffement
+        await client.get("/api/users/check/bench0")
+        done = asyncio.Event()
+        reader_task = asyncio.create_task(reader(client, done))
+        start = time.perf_counter()
+        await asyncio.gather(*(login_worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await reader_task
+
+    return {
+        "rps": total / elapsed,
+        "login": bench_common.percentiles(login_latencies),
+        "read": bench_common.percentiles(read_latencies),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Connexions concurrentes : bcrypt dans la boucle d'événements vs pool bcrypt")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50)
+    bench_common.add_server_arguments(parser, port=8766)
+    args = parser.parse_args()
+
+    if args.serve:
+        bench_common.serve(args.workdir, args.port, add_blocking_route)
+        return
+
+    workdir = bench_common.create_database()
+    import auth
+    from database import SessionLocal
+
+    db = SessionLocal()
+    bench_common.seed_users(db, args.users, PASSWORD)
+    db.close()
+
+    # Toutes les connexions viennent de la même adresse : limites désactivées (ratelimit.py)
+    process = bench_common.start_server(
+        __file__, workdir, args.port, {"RATE_LIMIT_IP_BURST": "0", "RATE_LIMIT_USERNAME_BURST": "0"}
+    )
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        scenarios = [
+            ("avant (bcrypt dans la boucle)", "/bench/blocking/login"),
+            ("après (pool bcrypt)", "/api/auth/login"),
+        ]
+
+        print(
+            f"{args.logins} connexions, {args.concurrency} clients simultanés, "
+            f"{auth.PASSWORD_HASH_WORKERS} thread(s) bcrypt (PASSWORD_HASH_WORKERS)"
+        )
+        for label, path in scenarios:
+            result = asyncio.run(run_load(base_url, path, args.logins, args.concurrency, args.users))
+            print(
+                f"{label:30s} {result['rps']:7.1f} connexions/s   "
+                f"connexion p50 {result['login']['p50']:7.1f} ms p95 {result['login']['p95']:7.1f} ms   "
+                f"lecture p50 {result['read']['p50']:7.1f} ms p95 {result['read']['p95']:7.1f} ms"
+            )
+    finally:
+        process.terminate()
+        process.wait()
+
+if __name__ == "__main__":
+    main()
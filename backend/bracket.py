@@ -0,0 +1,156 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Construction en mémoire des tableaux à élimination directe.
+# Ces fonctions ne touchent pas à la base de données : elles produisent des
+# dictionnaires prêts à être insérés en une seule fois dans la table matches.
+
+def make_match_id(tournament_id: int, round_num: int, match_number: int) -> str:
+    return f"round{round_num}-match{match_number}-tournament{tournament_id}"
+
+def count_rounds(max_teams: int) -> int:
+    """
+    Nombre de tours nécessaires pour un tableau de max_teams équipes (au moins 1).
+    """
+    rounds = 1
+    while 2**rounds < max_teams:
+        rounds += 1
+    return rounds
+
+def next_position(round_num: int, match_number: int) -> Tuple[int, int, str]:
+    """
+    Renvoie (tour, numéro de match, emplacement) du match qui reçoit le gagnant.
+    Les matchs impairs alimentent team1, les matchs pairs team2.
+    """
+    slot = "team1" if match_number % 2 == 1 else "team2"
+    return round_num + 1, (match_number + 1) // 2, slot
+
+def auto_validate(match: Dict) -> bool:
+    """
+    Valide automatiquement un match sans score qui n'a qu'une équipe (victoire
+    par forfait) ou aucune équipe (0-0). Renvoie True si un gagnant a été désigné.
+    """
+    if match["team1_score"] is not None and match["team2_score"] is not None:
+        return False
+
+    if match["team1_id"] and not match["team2_id"]:
+        match["team1_score"], match["team2_score"] = 1, 0
+        return True
+    if not match["team1_id"] and match["team2_id"]:
+        match["team1_score"], match["team2_score"] = 0, 1
+        return True
+    if not match["team1_id"] and not match["team2_id"]:
+        match["team1_score"], match["team2_score"] = 0, 0
+    return False
+
+def _field(match, name: str):
+    # Matchs du tableau en mémoire (dictionnaires) ou matchs chargés de la base
+    return match[name] if isinstance(match, dict) else getattr(match, name)
+
+def feeders_by_match(matches) -> Dict[str, List]:
+    """
+    Matchs qui alimentent chaque match : identifiant du match suivant -> matchs précédents.
+    """
+    feeders = defaultdict(list)
+    for match in matches:
+        if _field(match, "next_match_id") is not None:
+            feeders[_field(match, "next_match_id")].append(match)
+    return feeders
+
+def can_send_team(match, feeders: Dict[str, List]) -> bool:
+    """
+    Indique si un match peut encore envoyer une équipe au tour suivant : il a une
+    équipe et n'est pas joué, ou l'un des matchs qui l'alimentent le peut.
+    """
+    has_team = _field(match, "team1_id") or _field(match, "team2_id")
+    unplayed = _field(match, "team1_score") is None or _field(match, "team2_score") is None
+    if has_team and unplayed:
+        return True
+    return any(can_send_team(previous, feeders) for previous in feeders.get(_field(match, "id"), ()))
+
+def slot_can_receive_team(match, slot: str, feeders: Dict[str, List]) -> bool:
+    """
+    Indique si l'emplacement slot ("team1" ou "team2") d'un match peut encore
+    recevoir une équipe d'un match précédent.
+    """
+    return any(
+        can_send_team(previous, feeders)
+        for previous in feeders.get(_field(match, "id"), ())
+        if _field(previous, "next_match_slot") == slot
+    )
+
+def get_winner_id(match: Dict) -> Optional[int]:
+    if match["team1_score"] is None or match["team2_score"] is None:
+        return None
+    if match["team1_score"] > match["team2_score"]:
+        return match["team1_id"]
+    if match["team2_score"] > match["team1_score"]:
+        return match["team2_id"]
+    return None
+
+def build_bracket(tournament_id: int, team_ids: List[int], max_teams: int) -> List[Dict]:
+    """
+    Construit l'ensemble du tableau d'un tournoi : création de tous les matchs,
+    placement des équipes au premier tour, puis propagation des forfaits.
+
+    Les équipes sont placées deux par deux dans l'ordre d'inscription. Un match
+    qui n'a qu'une équipe est gagné par forfait, et son gagnant avancé, si aucun
+    match précédent ne peut plus lui envoyer d'adversaire (même règle que
+    crud.update_match_score). Un match qui ne recevra aucune équipe est validé
+    à 0-0 ; les autres restent à jouer.
+
+    Renvoie la liste des matchs, triée par tour puis par numéro de match.
+    """
+    rounds = count_rounds(max_teams)
+
+    bracket: Dict[Tuple[int, int], Dict] = {}
+    for round_num in range(1, rounds + 1):
+        for i in range(2**(rounds - round_num)):
+            bracket[(round_num, i + 1)] = {
+                "id": make_match_id(tournament_id, round_num, i + 1),
+                "tournament_id": tournament_id,
+                "team1_id": None,
+                "team2_id": None,
+                "team1_score": None,
+                "team2_score": None,
+                "round": round_num,
+                "match_number": i + 1,
+                "next_match_id": None,
+                "next_match_slot": None,
+            }
+
+    # Relier chaque match au match qui reçoit son gagnant
+    for match in bracket.values():
+        next_round, next_match_number, slot = next_position(match["round"], match["match_number"])
+        next_match = bracket.get((next_round, next_match_number))
+        if next_match is not None:
+            match["next_match_id"] = next_match["id"]
+            match["next_match_slot"] = slot
+    matches_by_id = {match["id"]: match for match in bracket.values()}
+
+    # Placer les équipes dans les matchs du premier tour
+    first_round_matches = 2**(rounds - 1)
+    for i, team_id in enumerate(team_ids):
+        position = i // 2
+        if position < first_round_matches:
+            slot = "team1_id" if i % 2 == 0 else "team2_id"
+            bracket[(1, position + 1)][slot] = team_id
+
+    # Valider les forfaits tour par tour. Un match à une seule équipe n'est gagné
+    # par forfait que si l'autre emplacement ne peut plus recevoir d'équipe ; son
+    # gagnant avance alors au tour suivant. Un match qui ne recevra aucune équipe
+    # est validé à 0-0. Les autres restent à jouer (scores None).
+    feeders = feeders_by_match(bracket.values())
+    for round_num in range(1, rounds + 1):
+        for i in range(2**(rounds - round_num)):
+            match = bracket[(round_num, i + 1)]
+            if match["team1_id"] and match["team2_id"]:
+                continue
+            if slot_can_receive_team(match, "team1", feeders) or slot_can_receive_team(match, "team2", feeders):
+                continue
+            if auto_validate(match):
+                next_match = matches_by_id.get(match["next_match_id"])
+                if next_match is not None:
+                    next_match[f"{match['next_match_slot']}_id"] = get_winner_id(match)
+
+    return list(bracket.values())
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+# Cache en mémoire des réponses des routes de lecture les plus sollicitées
+# (détail d'un tournoi, ses matchs, classements). Les corps JSON déjà sérialisés
+# sont gardés par ressource, puis supprimés par les écritures de crud.py qui
+# modifient cette ressource. Le cache est propre à chaque processus : avec
+# plusieurs workers, seule la durée de vie limite le décalage entre eux.
+
+# Nombre maximal de réponses gardées (les moins récemment lues sont supprimées)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+# Durée de vie d'une réponse en secondes (0 désactive le cache)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+# Identités des utilisateurs authentifiés (auth.get_user_from_token) : nombre
+# d'utilisateurs gardés et durée de vie en secondes (0 désactive le cache)
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "4096"))
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "30"))
+
+class ResponseCache:
+    """
+    Cache LRU borné avec durée de vie. Les clés sont des tuples dont le premier
+    élément est le type de ressource ("tournament", "scoreboard"...), ce qui
+    permet de supprimer toutes les entrées d'une ressource par préfixe.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrémenté à chaque invalidation : une réponse calculée pendant une
+        # écriture ne doit pas être enregistrée
+        self.generation = 0
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits[key[0]] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses[key[0]] += 1
+            return None
+
+    def set(self, key: tuple, value, generation: int):
+        """
+        Enregistre une réponse calculée à partir de la génération donnée, sauf si
+        une écriture a invalidé le cache entre-temps.
+        """
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *prefix):
+        """
+        Supprime les entrées dont la clé commence par prefix (tout le cache sans préfixe).
+        """
+        with self._lock:
+            self.generation += 1
+            keys = [key for key in self._entries if key[:len(prefix)] == prefix]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+
+    def stats(self):
+        with self._lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "resources": {
+                    resource: {"hits": self.hits[resource], "misses": self.misses[resource]}
+                    for resource in sorted(set(self.hits) | set(self.misses))
+                },
+            }
+
+responses = ResponseCache()
+
+# Colonnes des utilisateurs authentifiés, par nom d'utilisateur : le jeton est
+# toujours vérifié, seule la lecture de la table users est évitée
+identities = ResponseCache(IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL)
+
+# Invalidations appelées par crud.py après chaque écriture validée
+def invalidate_tournament(tournament_id: int):
+    responses.invalidate("tournament", tournament_id)
+    responses.invalidate("tournament_matches", tournament_id)
+
+def invalidate_scoreboard():
+    responses.invalidate("scoreboard")
+
+def invalidate_user(*usernames: str):
+    for username in usernames:
+        identities.invalidate("identity", username)
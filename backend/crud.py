@@ -1,10 +1,17 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, insert, select, tuple_
+from sqlalchemy.orm import Session, aliased, selectinload
 import uuid
+from datetime import datetime, timedelta
 from typing import List, Optional
 
 import models
 import schemas
 import auth
+import bracket
+import cache
+import events
+import pagination
+import ratings
 
 # Opérations CRUD pour les utilisateurs
 def get_user(db: Session, user_id: int):
@@ -16,39 +23,142 @@ def get_user_by_email(db: Session, email: str):
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, cursor: Optional[str] = None, limit: int = pagination.DEFAULT_PAGE_SIZE):
+    # Équipes et joueurs de la page chargés en une requête par relation (schemas.User)
+    query = db.query(models.User).options(selectinload(models.User.teams).selectinload(models.Team.players))
+    return pagination.paginate(query, models.User.id, cursor, limit)
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = auth.get_password_hash(user.password)
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    # Les routes hachent le mot de passe dans le pool bcrypt (auth.get_password_hash_async)
+    if hashed_password is None:
+        hashed_password = auth.get_password_hash(user.password)
     db_user = models.User(username=user.username, email=user.email, hashed_password=hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user_id: int, user: schemas.UserUpdate):
+def update_user(db: Session, user_id: int, user: schemas.UserUpdate, hashed_password: Optional[str] = None):
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if db_user is None:
         return None
     
     update_data = user.dict(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = auth.get_password_hash(update_data.pop("password"))
+        password = update_data.pop("password")
+        update_data["hashed_password"] = hashed_password or auth.get_password_hash(password)
     
+    previous_username = db_user.username
     for key, value in update_data.items():
         setattr(db_user, key, value)
     
+    # Un changement de mot de passe ferme les sessions ouvertes ailleurs
+    if "hashed_password" in update_data:
+        _revoke_user_refresh_tokens(db, user_id)
     db.commit()
+    cache.invalidate_user(previous_username, db_user.username)
     db.refresh(db_user)
     return db_user
 
+# Opérations pour les jetons de rafraîchissement
+def create_refresh_token(db: Session, user_id: int):
+    """
+    Crée un jeton de rafraîchissement pour l'utilisateur et le renvoie (seule son
+    empreinte est enregistrée).
+    """
+    token = _add_refresh_token(db, user_id)
+    db.commit()
+    return token
+
+def _add_refresh_token(db: Session, user_id: int):
+    token = auth.generate_refresh_token()
+    now = datetime.utcnow()
+    db.add(models.RefreshToken(
+        user_id=user_id,
+        token_hash=auth.hash_refresh_token(token),
+        created_at=now.isoformat(),
+        expires_at=(now + timedelta(days=auth.REFRESH_TOKEN_EXPIRE_DAYS)).isoformat(),
+        revoked=False,
+    ))
+    return token
+
+def rotate_refresh_token(db: Session, token: str):
+    """
+    Échange un jeton de rafraîchissement valide contre un nouveau : l'ancien est
+    révoqué. Renvoie (utilisateur, nouveau jeton), ou None si le jeton est inconnu,
+    expiré ou déjà révoqué. La réutilisation d'un jeton révoqué (jeton volé ou
+    rejoué) révoque tous les jetons de l'utilisateur.
+
+    Un jeton échangé depuis moins de REFRESH_TOKEN_REUSE_GRACE_SECONDS (un autre
+    onglet l'a rafraîchi en même temps) est de nouveau échangé contre un autre
+    successeur, sans révoquer les sessions : seule l'empreinte du premier
+    successeur est enregistrée, il ne peut donc pas être renvoyé.
+    """
+    db_token = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == auth.hash_refresh_token(token)
+    ).first()
+    if db_token is None:
+        return None
+    now = datetime.utcnow()
+    if db_token.expires_at <= now.isoformat():
+        return None
+
+    if db_token.revoked:
+        if not _recently_rotated(db_token, now):
+            _revoke_user_refresh_tokens(db, db_token.user_id)
+            db.commit()
+            return None
+    else:
+        # Révocation conditionnelle : de deux échanges simultanés du même jeton, un
+        # seul le révoque, l'autre passe par le délai de grâce
+        revoked = db.query(models.RefreshToken).filter(
+            models.RefreshToken.id == db_token.id,
+            models.RefreshToken.revoked.is_(False),
+        ).update({"revoked": True, "rotated_at": now.isoformat()}, synchronize_session=False)
+        if not revoked:
+            db.refresh(db_token)
+            if not _recently_rotated(db_token, now):
+                db.rollback()
+                return None
+
+    user = get_user(db, db_token.user_id)
+    if user is None:
+        db.commit()
+        return None
+    new_token = _add_refresh_token(db, user.id)
+    db.commit()
+    return user, new_token
+
+def _recently_rotated(db_token: models.RefreshToken, now: datetime):
+    if db_token.rotated_at is None:
+        return False
+    grace = timedelta(seconds=auth.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+    return db_token.rotated_at > (now - grace).isoformat()
+
+def revoke_refresh_token(db: Session, token: str):
+    """
+    Révoque un jeton de rafraîchissement (déconnexion). Renvoie True s'il était actif.
+    """
+    revoked = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == auth.hash_refresh_token(token),
+        models.RefreshToken.revoked.is_(False),
+    ).update({"revoked": True}, synchronize_session=False)
+    db.commit()
+    return revoked > 0
+
+def _revoke_user_refresh_tokens(db: Session, user_id: int):
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.user_id == user_id,
+        models.RefreshToken.revoked.is_(False),
+    ).update({"revoked": True}, synchronize_session=False)
+
 # Opérations CRUD pour les équipes
 def get_team(db: Session, team_id: int):
     return db.query(models.Team).filter(models.Team.id == team_id).first()
 
-def get_teams(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Team).offset(skip).limit(limit).all()
+def get_teams(db: Session, cursor: Optional[str] = None, limit: int = pagination.DEFAULT_PAGE_SIZE):
+    query = db.query(models.Team).options(selectinload(models.Team.players))
+    return pagination.paginate(query, models.Team.id, cursor, limit)
 
 def get_user_teams(db: Session, user_id: int):
     return db.query(models.Team).filter(models.Team.owner_id == user_id).all()
@@ -57,6 +167,7 @@ def create_team(db: Session, team: schemas.TeamCreate, user_id: int):
     db_team = models.Team(name=team.name, owner_id=user_id)
     db.add(db_team)
     db.commit()
+    cache.invalidate_scoreboard()
     db.refresh(db_team)
     return db_team
 
@@ -68,7 +179,10 @@ def update_team(db: Session, team_id: int, team: schemas.TeamBase):
     for key, value in team.dict().items():
         setattr(db_team, key, value)
     
+    tournament_ids = [tournament.id for tournament in db_team.tournaments]
+    _bump_tournament_versions(db, tournament_ids)
     db.commit()
+    _invalidate_team(tournament_ids)
     db.refresh(db_team)
     return db_team
 
@@ -77,10 +191,21 @@ def delete_team(db: Session, team_id: int):
     if db_team is None:
         return False
     
+    tournament_ids = [tournament.id for tournament in db_team.tournaments]
+    _bump_tournament_versions(db, tournament_ids)
     db.delete(db_team)
     db.commit()
+    _invalidate_team(tournament_ids)
     return True
 
+def _invalidate_team(tournament_ids: List[int]):
+    """
+    Le nom de l'équipe apparaît dans les classements et le détail de ses tournois.
+    """
+    cache.invalidate_scoreboard()
+    for tournament_id in tournament_ids:
+        cache.invalidate_tournament(tournament_id)
+
 # Opérations CRUD pour les joueurs
 def get_player(db: Session, player_id: int):
     return db.query(models.Player).filter(models.Player.id == player_id).first()
@@ -100,10 +225,21 @@ def get_player_teams(db: Session, player_id: int):
     
     return [team]
 
+def _set_player_wins(db: Session, db_player: models.Player):
+    """
+    Victoires d'un joueur qui rejoint une équipe ou change de statut, selon la règle
+    de stats.rebuild_stats : celles de son équipe s'il est actif, 0 sinon. Les
+    scores suivants sont ensuite comptés par _count_match_result.
+    """
+    team = get_team(db, db_player.team_id) if db_player.team_id is not None else None
+    db_player.wins = team.wins if team is not None and db_player.status in (None, "active") else 0
+
 def create_player(db: Session, player: schemas.PlayerCreate, team_id: int):
     db_player = models.Player(**player.dict(), team_id=team_id)
+    _set_player_wins(db, db_player)
     db.add(db_player)
     db.commit()
+    cache.invalidate_scoreboard()
     db.refresh(db_player)
     return db_player
 
@@ -114,8 +250,10 @@ def update_player(db: Session, player_id: int, player: schemas.PlayerBase):
     
     for key, value in player.dict().items():
         setattr(db_player, key, value)
+    _set_player_wins(db, db_player)
     
     db.commit()
+    cache.invalidate_scoreboard()
     db.refresh(db_player)
     return db_player
 
@@ -126,14 +264,107 @@ def delete_player(db: Session, player_id: int):
     
     db.delete(db_player)
     db.commit()
+    cache.invalidate_scoreboard()
     return True
 
 # Opérations CRUD pour les tournois
 def get_tournament(db: Session, tournament_id: int):
     return db.query(models.Tournament).filter(models.Tournament.id == tournament_id).first()
 
-def get_tournaments(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Tournament).offset(skip).limit(limit).all()
+def get_tournament_version(db: Session, tournament_id: int):
+    """
+    Version du tournoi (None s'il n'existe pas), lue sans charger le tournoi.
+    """
+    return db.execute(
+        select(models.Tournament.version).where(models.Tournament.id == tournament_id)
+    ).scalar_one_or_none()
+
+def _bump_tournament_versions(db: Session, tournament_ids: List[int]):
+    """
+    Incrémente la version des tournois modifiés, dans la transaction en cours :
+    les ETag de leur détail et de leurs matchs changent au prochain commit.
+    """
+    if tournament_ids:
+        db.query(models.Tournament).filter(models.Tournament.id.in_(tournament_ids)).update(
+            {models.Tournament.version: func.coalesce(models.Tournament.version, 0) + 1},
+            synchronize_session=False,
+        )
+
+def _publish_tournament_event(db: Session, tournament_id: int, event: str, matches: List[models.Match] = None, **data):
+    """
+    Envoie un événement aux flux SSE du tournoi, après le commit. Les matchs sont
+    sérialisés une seule fois, quel que soit le nombre de clients connectés.
+    """
+    if not events.has_subscribers(events.tournament_topic(tournament_id)):
+        return
+    if matches is not None:
+        data["matches"] = [schemas.Match.model_validate(match, from_attributes=True).model_dump() for match in matches]
+    events.publish_tournament_event(tournament_id, event, data, get_tournament_version(db, tournament_id))
+
+def _tournament_details_options():
+    # Équipes et matchs chargés en une requête par relation,
+    # quel que soit le nombre de tournois ou la taille des tableaux
+    return (
+        selectinload(models.Tournament.teams),
+        selectinload(models.Tournament.matches),
+    )
+
+def get_tournament_details(db: Session, tournament_id: int):
+    """
+    Tournoi avec ses équipes et ses matchs, pour la vue détaillée.
+    """
+    return (
+        db.query(models.Tournament)
+        .options(*_tournament_details_options())
+        .filter(models.Tournament.id == tournament_id)
+        .first()
+    )
+
+def get_tournaments(db: Session, cursor: Optional[str] = None, limit: int = pagination.DEFAULT_PAGE_SIZE):
+    """
+    Résumés des tournois pour les listes : nombre d'équipes et vainqueur sont
+    calculés en SQL, sans charger les équipes ni les matchs.
+    """
+    team_count = (
+        select(func.count())
+        .select_from(models.tournament_team)
+        .where(models.tournament_team.c.tournament_id == models.Tournament.id)
+        .scalar_subquery()
+    )
+
+    # La finale est le seul match du tournoi qui n'alimente aucun autre match.
+    # Le vainqueur n'est connu qu'une fois le tournoi clôturé.
+    final = aliased(models.Match)
+    winner_id = (
+        select(case(
+            (final.team1_score > final.team2_score, final.team1_id),
+            (final.team2_score > final.team1_score, final.team2_id),
+        ))
+        .where(
+            final.tournament_id == models.Tournament.id,
+            final.next_match_id.is_(None),
+            models.Tournament.status == "closed",
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+    winner = aliased(models.Team)
+
+    query = (
+        db.query(
+            models.Tournament.id,
+            models.Tournament.name,
+            models.Tournament.date,
+            models.Tournament.status,
+            models.Tournament.max_teams,
+            models.Tournament.owner_id,
+            team_count.label("team_count"),
+            winner.id.label("winner_id"),
+            winner.name.label("winner_name"),
+        )
+        .outerjoin(winner, winner.id == winner_id)
+    )
+    return pagination.paginate(query, models.Tournament.id, cursor, limit)
 
 def create_tournament(db: Session, tournament: schemas.TournamentCreate, user_id: int):
     db_tournament = models.Tournament(**tournament.dict(), status="open", owner_id=user_id)
@@ -150,7 +381,9 @@ def update_tournament(db: Session, tournament_id: int, tournament: schemas.Tourn
     for key, value in tournament.dict().items():
         setattr(db_tournament, key, value)
     
+    _bump_tournament_versions(db, [tournament_id])
     db.commit()
+    cache.invalidate_tournament(tournament_id)
     db.refresh(db_tournament)
     return db_tournament
 
@@ -161,6 +394,7 @@ def delete_tournament(db: Session, tournament_id: int):
     
     db.delete(db_tournament)
     db.commit()
+    cache.invalidate_tournament(tournament_id)
     return True
 
 def join_tournament(db: Session, tournament_id: int, team_id: int):
@@ -177,7 +411,9 @@ def join_tournament(db: Session, tournament_id: int, team_id: int):
         return False  # Le tournoi est complet
     
     db_tournament.teams.append(db_team)
+    _bump_tournament_versions(db, [tournament_id])
     db.commit()
+    cache.invalidate_tournament(tournament_id)
     return True
 
 def leave_tournament(db: Session, tournament_id: int, team_id: int):
@@ -191,7 +427,9 @@ def leave_tournament(db: Session, tournament_id: int, team_id: int):
         return True  # L'équipe n'est pas dans le tournoi
     
     db_tournament.teams.remove(db_team)
+    _bump_tournament_versions(db, [tournament_id])
     db.commit()
+    cache.invalidate_tournament(tournament_id)
     return True
 
 def start_tournament(db: Session, tournament_id: int):
@@ -206,178 +444,32 @@ def start_tournament(db: Session, tournament_id: int):
         raise ValueError("Tournament cannot be started with less than 1 team")
     
     try:
-        # Vérifier si des matchs existent déjà pour ce tournoi
-        existing_matches = db.query(models.Match).filter(models.Match.tournament_id == tournament_id).all()
-        if existing_matches:
-            # Si des matchs existent déjà, supprimer tous les matchs existants
-            for match in existing_matches:
-                db.delete(match)
-            
-            # Commit pour s'assurer que les suppressions sont appliquées
-            db.commit()
-        
-        # Mettre à jour le statut du tournoi
+        # Supprimer les matchs existants et mettre à jour le statut du tournoi
+        db.query(models.Match).filter(models.Match.tournament_id == tournament_id).delete()
         db_tournament.status = "in_progress"
-        db.commit()
-        
-        # Création des matchs du premier tour
-        teams = db_tournament.teams
-        created_matches = []
         
-        # Déterminer le nombre de tours nécessaires
-        max_teams = db_tournament.max_teams
-        rounds = 1
-        while 2**rounds < max_teams:
-            rounds += 1
+        # Construire tout le tableau en mémoire (placement des équipes et forfaits)
+        team_ids = [team.id for team in db_tournament.teams]
+        rows = bracket.build_bracket(tournament_id, team_ids, db_tournament.max_teams)
         
-        # Calculer le nombre de matchs pour le premier tour
-        first_round_matches = 2**(rounds-1)
-        
-        # Initialiser tous les matchs du premier tour
-        for i in range(first_round_matches):
-            match_id = f"round1-match{i+1}-tournament{tournament_id}"  # ID unique avec l'ID du tournoi
-            
-            # Vérifier si un match avec cet ID existe déjà
-            existing_match = db.query(models.Match).filter(models.Match.id == match_id).first()
-            if existing_match:
-                raise ValueError(f"Match with ID {match_id} already exists. Cannot create duplicate match.")
-            
-            db_match = models.Match(
-                id=match_id,
-                tournament_id=tournament_id,
-                team1_id=None,
-                team2_id=None,
-                round=1,
-                match_number=i+1
-            )
-            db.add(db_match)
-            created_matches.append(db_match)
-        
-        # Commit pour s'assurer que les matchs sont créés avant de les modifier
-        db.commit()
-        
-        # Placer les équipes dans les matchs selon la logique décrite
-        for i, team in enumerate(teams):
-            position = i // 2  # Position dans la séquence (0, 1, 2, ...)
-            is_team1 = (i % 2 == 0)  # Positions paires sont team1, impaires sont team2
-            
-            if position < len(created_matches):
-                match = created_matches[position]
-                if is_team1:
-                    match.team1_id = team.id
-                else:
-                    match.team2_id = team.id
-        
-        # Commit pour s'assurer que les équipes sont placées
-        db.commit()
-        
-        # Auto-valider les matchs avec une seule équipe
-        for match in created_matches:
-            if (match.team1_id and not match.team2_id) or (not match.team1_id and match.team2_id):
-                # Si un match a une équipe mais pas l'autre, auto-valider
-                if match.team1_id:
-                    match.team1_score = 1
-                    match.team2_score = 0
-                else:
-                    match.team1_score = 0
-                    match.team2_score = 1
-        
-        # Commit pour s'assurer que les scores sont mis à jour
-        db.commit()
-        
-        # Créer les matchs des tours suivants
-        next_round_matches = []
-        for round_num in range(2, rounds + 1):
-            matches_in_round = 2**(rounds - round_num)
-            round_matches = []
-            
-            for i in range(matches_in_round):
-                match_id = f"round{round_num}-match{i+1}-tournament{tournament_id}"  # ID unique avec l'ID du tournoi
-                
-                # Vérifier si un match avec cet ID existe déjà
-                existing_match = db.query(models.Match).filter(models.Match.id == match_id).first()
-                if existing_match:
-                    raise ValueError(f"Match with ID {match_id} already exists. Cannot create duplicate match.")
-                
-                db_match = models.Match(
-                    id=match_id,
-                    tournament_id=tournament_id,
-                    team1_id=None,
-                    team2_id=None,
-                    round=round_num,
-                    match_number=i+1
-                )
-                db.add(db_match)
-                round_matches.append(db_match)
-            
-            next_round_matches.append(round_matches)
+        # Insérer tous les matchs en une seule requête, la finale d'abord
+        # pour que chaque next_match_id référence un match déjà inséré
+        db.execute(insert(models.Match).execution_options(render_nulls=True), rows[::-1])
         
-        # Commit pour s'assurer que tous les matchs sont créés
-        db.commit()
-        
-        # Propager les gagnants des matchs auto-validés aux tours suivants
-        matches_to_process = created_matches.copy()
-        processed_matches = []
-        
-        while matches_to_process:
-            current_match = matches_to_process.pop(0)
-            
-            # Si le match a déjà été traité, passer au suivant
-            if current_match.id in processed_matches:
-                continue
-            
-            processed_matches.append(current_match.id)
-            
-            # Si le match a un score, propager le gagnant
-            if current_match.team1_score is not None and current_match.team2_score is not None:
-                # Déterminer l'équipe gagnante
-                winning_team_id = current_match.team1_id if current_match.team1_score > current_match.team2_score else current_match.team2_id
-                
-                # Trouver le match du tour suivant
-                next_round = current_match.round + 1
-                next_match_number = (current_match.match_number + 1) // 2
-                
-                # Rechercher le match suivant
-                next_match = db.query(models.Match).filter(
-                    models.Match.tournament_id == tournament_id,
-                    models.Match.round == next_round,
-                    models.Match.match_number == next_match_number
-                ).first()
-                
-                if next_match:
-                    # Déterminer si l'équipe gagnante doit être placée en team1 ou team2
-                    if current_match.match_number % 2 == 1:
-                        # Match impair, placer en team1
-                        next_match.team1_id = winning_team_id
-                    else:
-                        # Match pair, placer en team2
-                        next_match.team2_id = winning_team_id
-                    
-                    # Vérifier si le match suivant a maintenant une seule équipe (et pas l'autre)
-                    if (next_match.team1_id and not next_match.team2_id) or (not next_match.team1_id and next_match.team2_id):
-                        # Auto-valider ce match
-                        if next_match.team1_id:
-                            next_match.team1_score = 1
-                            next_match.team2_score = 0
-                        else:
-                            next_match.team1_score = 0
-                            next_match.team2_score = 1
-                        
-                        # Ajouter ce match à la liste des matchs à traiter
-                        matches_to_process.append(next_match)
+        # Vérifier si le tournoi est terminé après la création des matchs
+        all_matches = get_tournament_matches(db, tournament_id)
+        _close_tournament_if_completed(db, db_tournament, all_matches)
         
-        # Commit final pour s'assurer que toutes les modifications sont enregistrées
+        # Un seul commit pour l'ensemble du démarrage
+        _bump_tournament_versions(db, [tournament_id])
         db.commit()
-        
-        # Auto-valider tous les matchs qui n'ont pas d'équipes ou une seule équipe
-        auto_validate_empty_matches(db, tournament_id)
-        
-        # Vérifier si le tournoi est terminé après la création des matchs
-        check_tournament_completed(db, tournament_id)
+        cache.invalidate_tournament(tournament_id)
+        cache.invalidate_scoreboard()
         
         # Récupérer tous les matchs créés pour les renvoyer
-        all_matches = db.query(models.Match).filter(models.Match.tournament_id == tournament_id).all()
-        return all_matches
+        matches = get_tournament_matches(db, tournament_id)
+        _publish_tournament_event(db, tournament_id, "tournament", matches, status=db_tournament.status)
+        return matches
     except Exception as e:
         # En cas d'erreur, annuler les modifications et relancer l'exception
         db.rollback()
@@ -385,14 +477,20 @@ def start_tournament(db: Session, tournament_id: int):
 
 def auto_validate_empty_matches(db: Session, tournament_id: int):
     """
-    Auto-valide tous les matchs d'un tournoi qui n'ont pas d'équipes ou une seule équipe.
+    Auto-valide tous les matchs d'un tournoi qui n'ont pas d'équipes ou une seule équipe,
+    sauf ceux qu'un match précédent peut encore compléter (ils restent à jouer).
     """
     # Récupérer tous les matchs du tournoi
-    all_matches = db.query(models.Match).filter(models.Match.tournament_id == tournament_id).all()
+    all_matches = get_tournament_matches(db, tournament_id)
+    feeders = bracket.feeders_by_match(all_matches)
     
+    validated_matches = []
     for match in all_matches:
+        if bracket.slot_can_receive_team(match, "team1", feeders) or bracket.slot_can_receive_team(match, "team2", feeders):
+            continue
         # Si le match n'a pas de scores (n'est pas déjà validé)
         if match.team1_score is None or match.team2_score is None:
+            validated_matches.append(match)
             # Cas 1: Match avec une seule équipe
             if (match.team1_id and not match.team2_id):
                 match.team1_score = 1
@@ -406,16 +504,29 @@ def auto_validate_empty_matches(db: Session, tournament_id: int):
                 match.team2_score = 0
     
     # Commit pour s'assurer que les scores sont mis à jour
+    validated_matches = [match for match in validated_matches if match in db.dirty]
+    if validated_matches:
+        _bump_tournament_versions(db, [tournament_id])
     db.commit()
+    cache.invalidate_tournament(tournament_id)
+    if validated_matches:
+        _publish_tournament_event(db, tournament_id, "matches", validated_matches)
 
 # Opérations CRUD pour les matchs
 def get_match(db: Session, match_id: str):
     return db.query(models.Match).filter(models.Match.id == match_id).first()
 
 def get_tournament_matches(db: Session, tournament_id: int):
-    return db.query(models.Match).filter(models.Match.tournament_id == tournament_id).all()
+    return db.query(models.Match).filter(models.Match.tournament_id == tournament_id).order_by(
+        models.Match.round, models.Match.match_number
+    ).all()
 
 def update_match_score(db: Session, match_id: str, team1_score: int, team2_score: int):
+    """
+    Enregistre le score d'un match et avance le gagnant dans le tableau.
+    La propagation est itérative et tout est validé en un seul commit.
+    Renvoie la liste des matchs modifiés, en commençant par le match saisi.
+    """
     db_match = db.query(models.Match).filter(models.Match.id == match_id).first()
     if db_match is None:
         return None
@@ -429,21 +540,8 @@ def update_match_score(db: Session, match_id: str, team1_score: int, team2_score
     if not has_team1 or not has_team2:
         # Si ce n'est pas un match du premier tour, vérifier que les matchs précédents sont terminés
         if db_match.round > 1:
-            # Calculer les numéros des matchs précédents
-            prev_round = db_match.round - 1
-            match_num = db_match.match_number
-            tournament_id = db_match.tournament_id
-            
             # Les deux matchs précédents qui alimentent ce match
-            prev_match_num1 = match_num * 2 - 1
-            prev_match_num2 = match_num * 2
-            
-            # Vérifier que ces matchs existent et sont terminés
-            prev_matches = db.query(models.Match).filter(
-                models.Match.tournament_id == tournament_id,
-                models.Match.round == prev_round,
-                models.Match.match_number.in_([prev_match_num1, prev_match_num2])
-            ).all()
+            prev_matches = db.query(models.Match).filter(models.Match.next_match_id == db_match.id).all()
             
             # Vérifier si tous les matchs précédents sont terminés
             for prev_match in prev_matches:
@@ -452,8 +550,16 @@ def update_match_score(db: Session, match_id: str, team1_score: int, team2_score
     
     # Si les deux équipes sont présentes, mettre à jour normalement
     if has_team1 and has_team2:
+        first_score = db_match.team1_score is None or db_match.team2_score is None
+        # Une nouvelle saisie remplace le résultat précédent dans les compteurs
+        # et les classements (le match est reclassé après la propagation)
+        if not first_score:
+            _count_match_result(db, db_match, -1)
+            ratings.revert_match_ratings(db, db_match)
+
         db_match.team1_score = team1_score
         db_match.team2_score = team2_score
+        _count_match_result(db, db_match, 1)
         
         # Déterminer l'équipe gagnante
         winning_team_id = None
@@ -462,6 +568,7 @@ def update_match_score(db: Session, match_id: str, team1_score: int, team2_score
         elif team2_score > team1_score:
             winning_team_id = db_match.team2_id
     # Si une seule équipe est présente, elle est automatiquement gagnante
+    # (forfait : comme pour les forfaits propagés, les compteurs ne changent pas)
     elif has_team1 and not has_team2:
         db_match.team1_score = 1
         db_match.team2_score = 0
@@ -476,84 +583,91 @@ def update_match_score(db: Session, match_id: str, team1_score: int, team2_score
         db_match.team2_score = 0
         winning_team_id = None
     
-    # Mettre à jour les victoires de l'équipe gagnante et de ses joueurs
-    if winning_team_id:
-        # Mettre à jour les victoires de l'équipe
-        winning_team = db.query(models.Team).filter(models.Team.id == winning_team_id).first()
-        if winning_team:
-            winning_team.wins += 1
-            
-            # Mettre à jour les victoires des joueurs de l'équipe
-            for player in winning_team.players:
-                player.wins += 1
-        
-        # Mettre à jour les défaites de l'équipe perdante
-        losing_team_id = None
-        if has_team1 and has_team2:
-            if winning_team_id == db_match.team1_id:
-                losing_team_id = db_match.team2_id
-            else:
-                losing_team_id = db_match.team1_id
-            
-            if losing_team_id:
-                losing_team = db.query(models.Team).filter(models.Team.id == losing_team_id).first()
-                if losing_team:
-                    losing_team.losses += 1
-    
-    # Si un gagnant est déterminé, le propager au tour suivant
-    if winning_team_id:
-        # Extraire le numéro du tour et du match
-        round_num = db_match.round
-        match_num = db_match.match_number
-        tournament_id = db_match.tournament_id
-        
-        # Calculer le numéro du match au tour suivant
-        next_round = round_num + 1
-        next_match_number = (match_num + 1) // 2
-        
-        # Trouver le match du tour suivant
-        next_match = db.query(models.Match).filter(
-            models.Match.tournament_id == tournament_id,
-            models.Match.round == next_round,
-            models.Match.match_number == next_match_number
-        ).first()
+    # Propager le gagnant de tour en tour tant que le match suivant n'a qu'une équipe
+    updated_matches = [db_match]
+    current_match = db_match
+    # Matchs précédents de chaque match, chargés au premier besoin puis réutilisés
+    # à chaque tour (ce sont les objets de la session, donc à jour)
+    feeders = None
+    while winning_team_id:
+        next_match, slot = _get_next_match(current_match)
+        if next_match is None:
+            break
+
+        # Le match suivant avait déjà été joué (correction d'un score) : retirer son résultat
+        if next_match.team1_id and next_match.team2_id and next_match.team1_score is not None and next_match.team2_score is not None:
+            _count_match_result(db, next_match, -1)
+            ratings.revert_match_ratings(db, next_match)
+
+        setattr(next_match, f"{slot}_id", winning_team_id)
+        updated_matches.append(next_match)
         
-        if next_match:
-            # Déterminer si l'équipe gagnante doit être placée en team1 ou team2
-            if match_num % 2 == 1:
-                # Match impair, placer en team1
-                next_match.team1_id = winning_team_id
-            else:
-                # Match pair, placer en team2
-                next_match.team2_id = winning_team_id
-            
-            # Vérifier si le match suivant a maintenant ses deux équipes
-            if next_match.team1_id and next_match.team2_id:
-                # Réinitialiser les scores si les deux équipes sont présentes
-                next_match.team1_score = None
-                next_match.team2_score = None
-            # Vérifier si le match suivant a maintenant une seule équipe (et pas l'autre)
-            elif (next_match.team1_id and not next_match.team2_id) or (not next_match.team1_id and next_match.team2_id):
-                # Auto-valider ce match
-                if next_match.team1_id:
-                    next_match.team1_score = 1
-                    next_match.team2_score = 0
-                else:
-                    next_match.team1_score = 0
-                    next_match.team2_score = 1
-                
-                # Propager récursivement ce gagnant au tour suivant
-                update_match_score(
-                    db, 
-                    next_match.id, 
-                    next_match.team1_score, 
-                    next_match.team2_score
-                )
+        # Si les deux équipes sont présentes, réinitialiser les scores : le match reste à jouer
+        if next_match.team1_id and next_match.team2_id:
+            next_match.team1_score = None
+            next_match.team2_score = None
+            break
+
+        # Une seule équipe : si l'autre emplacement peut encore recevoir une équipe,
+        # le match suivant reste à jouer
+        if feeders is None:
+            feeders = bracket.feeders_by_match(get_tournament_matches(db, db_match.tournament_id))
+        empty_slot = "team2" if slot == "team1" else "team1"
+        if bracket.slot_can_receive_team(next_match, empty_slot, feeders):
+            next_match.team1_score = None
+            next_match.team2_score = None
+            break
+
+        # Sinon, la seule équipe présente gagne par forfait et continue au tour suivant
+        if next_match.team1_id:
+            next_match.team1_score = 1
+            next_match.team2_score = 0
+        else:
+            next_match.team1_score = 0
+            next_match.team2_score = 1
+        winning_team_id = next_match.team1_id or next_match.team2_id
+        current_match = next_match
     
+    # Classements Elo du match saisi, une fois annulés ceux des matchs remis à
+    # jouer : le résultat est celui d'un recalcul complet (sans effet pour un forfait)
+    ratings.update_match_ratings(db, db_match)
+
+    # Un seul commit pour le match saisi et toute la propagation
+    _bump_tournament_versions(db, [db_match.tournament_id])
     db.commit()
-    db.refresh(db_match)
+    cache.invalidate_tournament(db_match.tournament_id)
+    cache.invalidate_scoreboard()
+    _publish_tournament_event(db, db_match.tournament_id, "matches", updated_matches)
     
-    return db_match
+    return updated_matches
+
+def _count_match_result(db: Session, db_match: models.Match, step: int):
+    """
+    Ajoute (step=1) ou retire (step=-1) le résultat d'un match joué aux victoires et
+    défaites des deux équipes et aux victoires des joueurs actifs de l'équipe gagnante.
+    Mêmes règles que la reconstruction complète de stats.py.
+    """
+    if db_match.team1_score > db_match.team2_score:
+        winning_team, losing_team = db_match.team1, db_match.team2
+    elif db_match.team2_score > db_match.team1_score:
+        winning_team, losing_team = db_match.team2, db_match.team1
+    else:
+        return
+
+    if winning_team:
+        winning_team.wins += step
+        for player in winning_team.players:
+            if player.status in (None, "active"):
+                player.wins += step
+    if losing_team:
+        losing_team.losses += step
+
+def _get_next_match(db_match: models.Match):
+    """
+    Renvoie le match qui reçoit le gagnant de db_match et l'emplacement (team1 ou team2) à remplir.
+    """
+    # Suivi direct du lien : recherche par clé primaire, servie par la session si le match est déjà chargé
+    return db_match.next_match, db_match.next_match_slot
 
 def check_tournament_completed(db: Session, tournament_id: int):
     """
@@ -572,9 +686,27 @@ def check_tournament_completed(db: Session, tournament_id: int):
     # Récupérer tous les matchs du tournoi
     all_matches = db.query(models.Match).filter(models.Match.tournament_id == tournament_id).all()
     
+    if not _close_tournament_if_completed(db, db_tournament, all_matches):
+        return False
+    
+    _bump_tournament_versions(db, [tournament_id])
+    db.commit()
+    cache.invalidate_tournament(tournament_id)
+    cache.invalidate_scoreboard()
+    _publish_tournament_event(db, tournament_id, "tournament", status=db_tournament.status)
+    return True
+
+def _close_tournament_if_completed(db: Session, db_tournament: models.Tournament, all_matches: List[models.Match]):
+    """
+    Clôture le tournoi si tous ses matchs sont terminés, sans valider la transaction.
+    """
     # Si aucun match, le tournoi ne peut pas être terminé
     if not all_matches:
         return False
+
+    # Déjà clôturé : le vainqueur a déjà été compté
+    if db_tournament.status == "closed":
+        return True
     
     # Vérifier si tous les matchs sont terminés ou n'ont pas d'équipes assignées
     for match in all_matches:
@@ -605,117 +737,172 @@ def check_tournament_completed(db: Session, tournament_id: int):
         if final_match.team1_score is not None and final_match.team2_score is not None:
             # Déterminer l'équipe gagnante
             winning_team_id = None
-            losing_team_id = None
             if final_match.team1_score > final_match.team2_score:
                 winning_team_id = final_match.team1_id
-                losing_team_id = final_match.team2_id
             elif final_match.team2_score > final_match.team1_score:
                 winning_team_id = final_match.team2_id
-                losing_team_id = final_match.team1_id
             
-            # Mettre à jour les statistiques de l'équipe gagnante
+            # Mettre à jour les statistiques de l'équipe gagnante. La victoire et la
+            # défaite de la finale elle-même ont déjà été comptées avec son score.
             if winning_team_id:
                 winning_team = db.query(models.Team).filter(models.Team.id == winning_team_id).first()
                 if winning_team:
-                    # Ajouter une victoire supplémentaire pour avoir gagné le tournoi
-                    winning_team.wins += 1
                     # Incrémenter le compteur de tournois gagnés
                     winning_team.tournaments_won += 1
-            
-            # Mettre à jour les statistiques de l'équipe perdante (finaliste)
-            if losing_team_id:
-                losing_team = db.query(models.Team).filter(models.Team.id == losing_team_id).first()
-                if losing_team:
-                    # Ajouter une défaite supplémentaire pour avoir perdu la finale
-                    losing_team.losses += 1
     
-    db.commit()
     return True
 
 # Opérations pour le classement
-def get_team_rankings(db: Session):
-    teams = db.query(models.Team).all()
-    rankings = []
-    
-    for team in teams:
-        rankings.append({
-            "id": team.id,
-            "name": team.name,
-            "wins": team.wins,
-            "losses": team.losses,
-            "tournaments_won": team.tournaments_won
-        })
-    
-    # Trier par victoires (décroissant)
-    rankings.sort(key=lambda x: (x["wins"], x["tournaments_won"]), reverse=True)
-    return rankings
+# Classements, par classement Elo ou par victoires : les meilleurs scores sont lus
+# dans les index ix_teams_rating / ix_teams_ranking (et ceux des joueurs), parcourus à l'envers. À égalité, l'identifiant le plus
+# grand passe en premier, ce qui garde un ordre total pour les curseurs.
+TEAM_RANKING_KEYS = {
+    "rating": (models.Team.rating, models.Team.id),
+    "wins": (models.Team.wins, models.Team.tournaments_won, models.Team.id),
+}
+PLAYER_RANKING_KEYS = {
+    "rating": (models.Player.rating, models.Player.id),
+    "wins": (models.Player.wins, models.Player.id),
+}
 
-def get_player_rankings(db: Session):
-    players = db.query(models.Player).all()
-    rankings = []
-    
-    for player in players:
-        rankings.append({
-            "id": player.id,
-            "name": player.name,
-            "wins": player.wins
-        })
-    
-    # Trier par nombre de victoires (décroissant)
-    rankings.sort(key=lambda x: x["wins"], reverse=True)
-    
-    # Limiter aux 10 meilleurs joueurs
-    return rankings[:10]
+def _rank_page(db: Session, model, ranking_key, rows):
+    """
+    Ajoute le rang (classement "1224" : les ex aequo partagent le même rang) aux
+    lignes d'une page, à partir de deux comptages sur l'index du classement.
+    """
+    if not rows:
+        return []
+    score_columns = ranking_key[:-1]
+
+    first = rows[0]
+    first_key = tuple(getattr(first, column.key) for column in ranking_key)
+    # Lignes classées strictement devant : sur le score (rang) et sur la clé complète (position)
+    rank = 1 + db.query(func.count(model.id)).filter(
+        tuple_(*score_columns) > tuple_(*first_key[:-1])
+    ).scalar()
+    position = 1 + db.query(func.count(model.id)).filter(
+        tuple_(*ranking_key) > tuple_(*first_key)
+    ).scalar()
+
+    ranked = []
+    previous_score = first_key[:-1]
+    for offset, row in enumerate(rows):
+        score = tuple(getattr(row, column.key) for column in score_columns)
+        if score != previous_score:
+            rank = position + offset
+            previous_score = score
+        ranked.append({**row._mapping, "rank": rank})
+    return ranked
+
+def _scoreboard_team_query(db: Session):
+    return db.query(
+        models.Team.id,
+        models.Team.name,
+        models.Team.wins,
+        models.Team.losses,
+        models.Team.tournaments_won,
+        models.Team.rating,
+    )
+
+def get_team_rankings(db: Session, by: str = "rating", cursor: Optional[str] = None, limit: int = pagination.DEFAULT_PAGE_SIZE):
+    """
+    Classement des équipes par classement Elo (by="rating") ou par victoires puis
+    tournois gagnés (by="wins"). Renvoie (équipes avec leur rang, curseur suivant).
+    """
+    ranking_key = TEAM_RANKING_KEYS[by]
+    teams, next_cursor = pagination.paginate(_scoreboard_team_query(db), ranking_key, cursor, limit, descending=True)
+    return _rank_page(db, models.Team, ranking_key, teams), next_cursor
+
+def get_team_rank(db: Session, team_id: int, by: str = "rating"):
+    """
+    Position d'une équipe dans le classement, ou None si elle n'existe pas.
+    """
+    team = _scoreboard_team_query(db).filter(models.Team.id == team_id).first()
+    if team is None:
+        return None
+    return _rank_page(db, models.Team, TEAM_RANKING_KEYS[by], [team])[0]
+
+def get_player_rankings(db: Session, by: str = "rating", cursor: Optional[str] = None, limit: int = 10):
+    """
+    Classement des joueurs par classement Elo ou par victoires (les 10 premiers par défaut).
+    Renvoie (joueurs avec leur rang, curseur suivant).
+    """
+    ranking_key = PLAYER_RANKING_KEYS[by]
+    query = db.query(models.Player.id, models.Player.name, models.Player.wins, models.Player.rating)
+    players, next_cursor = pagination.paginate(query, ranking_key, cursor, limit, descending=True)
+    return _rank_page(db, models.Player, ranking_key, players), next_cursor
 
 # Opérations pour les matchs d'un utilisateur
-def get_user_matches(db: Session, user_id: int):
-    # Récupérer les équipes de l'utilisateur
-    user_teams = db.query(models.Team).filter(models.Team.owner_id == user_id).all()
-    user_team_ids = [team.id for team in user_teams]
-    
-    # Récupérer les matchs où l'utilisateur est impliqué
-    matches = db.query(models.Match).filter(
-        (models.Match.team1_id.in_(user_team_ids)) | 
-        (models.Match.team2_id.in_(user_team_ids))
-    ).all()
-    
-    result = []
-    for match in matches:
-        tournament = db.query(models.Tournament).filter(models.Tournament.id == match.tournament_id).first()
-        if not tournament:
-            continue  # Skip if tournament doesn't exist
-            
-        team1 = db.query(models.Team).filter(models.Team.id == match.team1_id).first()
-        team2 = db.query(models.Team).filter(models.Team.id == match.team2_id).first()
-        
-        # Skip if either team doesn't exist
-        if not team1 or not team2:
-            continue
-            
-        # Déterminer l'équipe de l'utilisateur et l'adversaire
-        if match.team1_id in user_team_ids:
-            user_team = team1
-            opponent = team2
-            user_is_team1 = True
-        else:
-            user_team = team2
-            opponent = team1
-            user_is_team1 = False
-        
-        result.append({
-            "id": match.id,
-            "tournament": tournament.name,
-            "opponent": opponent.name,
-            "date": tournament.date,
-            "team": user_team.name,
-            "team1_id": match.team1_id,
-            "team2_id": match.team2_id,
-            "team1_score": match.team1_score,
-            "team2_score": match.team2_score,
-            "user_is_team1": user_is_team1
-        })
-    
-    return result
+def get_user_matches(
+    db: Session,
+    user_id: int,
+    tournament_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    result: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+):
+    """
+    Matchs des équipes d'un utilisateur, du plus récent au plus ancien.
+    Renvoie (matchs, curseur suivant) ; voir _match_history pour les filtres.
+    """
+    user_team_ids = select(models.Team.id).where(models.Team.owner_id == user_id)
+    user_is_team1 = models.Match.team1_id.in_(user_team_ids)
+    team1 = aliased(models.Team)
+    team2 = aliased(models.Team)
+
+    query = (
+        db.query(
+            models.Match.id,
+            models.Match.tournament_id,
+            models.Tournament.name.label("tournament"),
+            case((user_is_team1, team2.name), else_=team1.name).label("opponent"),
+            models.Tournament.date,
+            case((user_is_team1, team1.name), else_=team2.name).label("team"),
+            models.Match.team1_id,
+            models.Match.team2_id,
+            models.Match.team1_score,
+            models.Match.team2_score,
+            models.Match.round,
+            models.Match.match_number,
+            user_is_team1.label("user_is_team1"),
+        )
+        .join(models.Tournament, models.Tournament.id == models.Match.tournament_id)
+        # Les matchs dont une équipe manque (forfaits, tours à venir) ne sont pas listés
+        .join(team1, team1.id == models.Match.team1_id)
+        .join(team2, team2.id == models.Match.team2_id)
+        .filter(user_is_team1 | models.Match.team2_id.in_(user_team_ids))
+    )
+    matches, next_cursor = _match_history(
+        query, user_is_team1, tournament_id, date_from, date_to, result, cursor, limit
+    )
+    return [dict(match._mapping) for match in matches], next_cursor
+
+def get_user_match_stats(db: Session, user_id: int):
+    """
+    Totaux des matchs listés par get_user_matches (page de profil), calculés en une
+    seule agrégation plutôt qu'en parcourant tout l'historique.
+    """
+    user_team_ids = select(models.Team.id).where(models.Team.owner_id == user_id)
+    user_is_team1 = models.Match.team1_id.in_(user_team_ids)
+    team_score = case((user_is_team1, models.Match.team1_score), else_=models.Match.team2_score)
+    opponent_score = case((user_is_team1, models.Match.team2_score), else_=models.Match.team1_score)
+    team1 = aliased(models.Team)
+    team2 = aliased(models.Team)
+
+    matches_played, victories, points_scored = (
+        db.query(
+            func.count(models.Match.id),
+            func.coalesce(func.sum(case((team_score > opponent_score, 1), else_=0)), 0),
+            func.coalesce(func.sum(team_score), 0),
+        )
+        .join(team1, team1.id == models.Match.team1_id)
+        .join(team2, team2.id == models.Match.team2_id)
+        .filter(user_is_team1 | models.Match.team2_id.in_(user_team_ids))
+        .one()
+    )
+    return {"matches_played": matches_played, "victories": victories, "points_scored": points_scored}
 
 # Fonctions pour vérifier si un utilisateur existe par son nom d'utilisateur
 def check_user_exists(db: Session, username: str):
@@ -727,19 +914,81 @@ def create_notification(db: Session, notification: schemas.NotificationCreate):
     db.add(db_notification)
     db.commit()
     db.refresh(db_notification)
+    _publish_notification(db, db_notification)
     return db_notification
 
-def get_user_notifications(db: Session, user_id: int):
-    return db.query(models.Notification).filter(models.Notification.user_id == user_id).all()
+def get_user_notifications(
+    db: Session,
+    user_id: int,
+    unread_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+):
+    """
+    Notifications d'un utilisateur, de la plus récente à la plus ancienne, lues dans
+    l'index ix_notifications_user_read_created. Renvoie (notifications, curseur suivant).
+    """
+    query = db.query(models.Notification).filter(models.Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(models.Notification.is_read == False)
+    return pagination.paginate(
+        query, (models.Notification.created_at, models.Notification.id), cursor, limit, descending=True
+    )
+
+def count_unread_notifications(db: Session, user_id: int):
+    # Compté dans l'index ix_notifications_user_read_created, sans lire les notifications
+    return db.query(func.count(models.Notification.id)).filter(
+        models.Notification.user_id == user_id,
+        models.Notification.is_read == False,
+    ).scalar()
+
+def get_notification(db: Session, notification_id: int):
+    return db.query(models.Notification).filter(models.Notification.id == notification_id).first()
 
 def mark_notification_as_read(db: Session, notification_id: int):
-    db_notification = db.query(models.Notification).filter(models.Notification.id == notification_id).first()
+    # Recherche par clé primaire : servie par la session si la route a déjà chargé la notification
+    db_notification = db.get(models.Notification, notification_id)
     if db_notification:
         db_notification.is_read = True
         db.commit()
         db.refresh(db_notification)
+        _publish_unread_count(db, db_notification.user_id)
     return db_notification
 
+def mark_notifications_as_read(db: Session, user_id: int, notification_ids: Optional[List[int]] = None):
+    """
+    Marque comme lues les notifications d'un utilisateur (toutes, ou seulement
+    notification_ids) en une seule requête UPDATE. Renvoie le nombre de notifications modifiées.
+    """
+    query = db.query(models.Notification).filter(
+        models.Notification.user_id == user_id,
+        models.Notification.is_read == False,
+    )
+    if notification_ids is not None:
+        query = query.filter(models.Notification.id.in_(notification_ids))
+    updated = query.update({models.Notification.is_read: True}, synchronize_session=False)
+    db.commit()
+    if updated:
+        _publish_unread_count(db, user_id)
+    return updated
+
+def _publish_notification(db: Session, db_notification: models.Notification):
+    """
+    Envoie une nouvelle notification, puis le nombre de notifications non lues,
+    aux flux SSE de son destinataire (après le commit).
+    """
+    topic = events.user_topic(db_notification.user_id)
+    if not events.has_subscribers(topic):
+        return
+    notification = schemas.Notification.model_validate(db_notification, from_attributes=True)
+    events.publish_event(topic, "notification", notification.model_dump())
+    _publish_unread_count(db, db_notification.user_id)
+
+def _publish_unread_count(db: Session, user_id: int):
+    topic = events.user_topic(user_id)
+    if events.has_subscribers(topic):
+        events.publish_event(topic, "unread", {"count": count_unread_notifications(db, user_id)})
+
 # Fonctions pour les invitations de joueurs
 def invite_player_to_team(db: Session, team_id: int, username: str):
     # Vérifier si l'utilisateur existe
@@ -769,6 +1018,7 @@ def invite_player_to_team(db: Session, team_id: int, username: str):
     )
     db.add(player)
     db.commit()
+    cache.invalidate_scoreboard()
     db.refresh(player)
     
     # Créer une notification pour l'utilisateur invité
@@ -788,6 +1038,7 @@ def invite_player_to_team(db: Session, team_id: int, username: str):
     )
     db.add(notification)
     db.commit()
+    _publish_notification(db, notification)
     
     return player
 
@@ -800,8 +1051,10 @@ def respond_to_team_invitation(db: Session, player_id: int, accept: bool):
         player.status = "active"
     else:
         player.status = "declined"
+    _set_player_wins(db, player)
     
     db.commit()
+    cache.invalidate_scoreboard()
     db.refresh(player)
     return player
 
@@ -811,38 +1064,88 @@ def get_team_tournaments(db: Session, team_id: int):
     tournament_ids = [tt.tournament_id for tt in team_tournaments]
     
     # Récupérer les détails des tournois
-    tournaments = db.query(models.Tournament).filter(models.Tournament.id.in_(tournament_ids)).all()
+    tournaments = (
+        db.query(models.Tournament)
+        .options(*_tournament_details_options())
+        .filter(models.Tournament.id.in_(tournament_ids))
+        .all()
+    )
     return tournaments
 
-def get_team_matches(db: Session, team_id: int):
-    # Récupérer tous les matchs où l'équipe est impliquée (équipe 1 ou équipe 2)
-    matches = db.query(models.Match).filter(
-        (models.Match.team1_id == team_id) | (models.Match.team2_id == team_id)
-    ).all()
-    
-    result = []
-    for match in matches:
-        # Récupérer les noms des équipes
-        team1 = db.query(models.Team).filter(models.Team.id == match.team1_id).first()
-        team2 = db.query(models.Team).filter(models.Team.id == match.team2_id).first()
-        
-        # Récupérer le nom du tournoi
-        tournament = db.query(models.Tournament).filter(models.Tournament.id == match.tournament_id).first()
-        
-        match_data = {
-            "id": match.id,
-            "tournament_id": match.tournament_id,
-            "tournament_name": tournament.name if tournament else None,
-            "team1_id": match.team1_id,
-            "team1_name": team1.name if team1 else None,
-            "team2_id": match.team2_id,
-            "team2_name": team2.name if team2 else None,
-            "team1_score": match.team1_score,
-            "team2_score": match.team2_score,
-            "round": match.round,
-            "match_number": match.match_number,
-            "date": tournament.date if tournament else None
-        }
-        result.append(match_data)
-    
-    return result 
\ No newline at end of file
+def get_team_matches(
+    db: Session,
+    team_id: int,
+    tournament_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    result: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+):
+    """
+    Matchs d'une équipe avec les noms des équipes et du tournoi, du plus récent
+    au plus ancien. Renvoie (matchs, curseur suivant) ; voir _match_history pour les filtres.
+    """
+    team1 = aliased(models.Team)
+    team2 = aliased(models.Team)
+
+    query = (
+        db.query(
+            models.Match.id,
+            models.Match.tournament_id,
+            models.Tournament.name.label("tournament_name"),
+            models.Match.team1_id,
+            team1.name.label("team1_name"),
+            models.Match.team2_id,
+            team2.name.label("team2_name"),
+            models.Match.team1_score,
+            models.Match.team2_score,
+            models.Match.round,
+            models.Match.match_number,
+            models.Tournament.date,
+        )
+        .join(models.Tournament, models.Tournament.id == models.Match.tournament_id)
+        .outerjoin(team1, team1.id == models.Match.team1_id)
+        .outerjoin(team2, team2.id == models.Match.team2_id)
+        .filter((models.Match.team1_id == team_id) | (models.Match.team2_id == team_id))
+    )
+    matches, next_cursor = _match_history(
+        query, models.Match.team1_id == team_id, tournament_id, date_from, date_to, result, cursor, limit
+    )
+    return [dict(match._mapping) for match in matches], next_cursor
+
+def _match_history(query, is_team1, tournament_id, date_from, date_to, result, cursor, limit):
+    """
+    Filtres et pagination communs aux historiques de matchs.
+    is_team1 est la condition SQL vraie quand l'équipe suivie joue en team1.
+    - tournament_id : matchs d'un seul tournoi
+    - date_from / date_to : dates de tournoi (AAAA-MM-JJ) comprises entre ces bornes, incluses
+    - result : "win", "loss" ou "pending" (match sans score)
+    Les matchs sont triés par date de tournoi, tournoi, tour et numéro de match décroissants.
+    """
+    if tournament_id is not None:
+        query = query.filter(models.Match.tournament_id == tournament_id)
+    if date_from is not None:
+        query = query.filter(models.Tournament.date >= date_from)
+    if date_to is not None:
+        query = query.filter(models.Tournament.date <= date_to)
+
+    if result is not None:
+        team_score = case((is_team1, models.Match.team1_score), else_=models.Match.team2_score)
+        opponent_score = case((is_team1, models.Match.team2_score), else_=models.Match.team1_score)
+        if result == "win":
+            query = query.filter(team_score > opponent_score)
+        elif result == "loss":
+            query = query.filter(team_score < opponent_score)
+        elif result == "pending":
+            query = query.filter(models.Match.team1_score.is_(None) | models.Match.team2_score.is_(None))
+        else:
+            raise ValueError("Invalid result filter")
+
+    key_columns = (
+        models.Tournament.date,
+        models.Match.tournament_id,
+        models.Match.round,
+        models.Match.match_number,
+    )
+    return pagination.paginate(query, key_columns, cursor, limit, descending=True)
@@ -1,14 +1,66 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Création de l'URL de connexion à la base de données SQLite
-SQLALCHEMY_DATABASE_URL = "sqlite:///./babyfoot_tournament.db"
+import slow_queries
+
+# URL de connexion à la base de données (docker-compose définit DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./babyfoot_tournament.db")
+
+# Taille du pool de connexions du moteur (partagé par les threads des routes)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Réglages SQLite appliqués à chaque nouvelle connexion.
+# En mode WAL, les lectures ne sont plus bloquées par l'écriture d'un score
+# (et inversement) ; synchronous=NORMAL suffit à garantir l'intégrité en WAL.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+# Attente maximale (ms) d'un verrou d'écriture avant l'erreur "database is locked"
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+# Cache de pages par connexion : une valeur négative est exprimée en Kio (ici 64 Mio)
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+# Taille (octets) de la base lue via mmap plutôt que par appels read()
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+def _is_sqlite_memory(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def _engine_options(url) -> dict:
+    options = {}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT / 1000}
+    # Une base SQLite en mémoire n'existe que dans sa connexion : pas de pool
+    if not _is_sqlite_memory(url):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+database_url = make_url(SQLALCHEMY_DATABASE_URL)
+
+# Création du moteur SQLAlchemy. Les routes de l'API sont des fonctions
+# synchrones exécutées par FastAPI dans son pool de threads : les requêtes SQL
+# ne bloquent pas la boucle d'événements d'uvicorn, et chaque thread prend une
+# connexion du pool du moteur.
+engine = create_engine(database_url, **_engine_options(database_url))
+
+if database_url.get_backend_name() == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
 
-# Création du moteur SQLAlchemy
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Journal des requêtes lentes, avec leur plan d'exécution (SLOW_QUERY_THRESHOLD_MS)
+slow_queries.instrument_engine(engine)
 
 # Création d'une session locale
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -22,4 +74,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -8,29 +8,25 @@ import models
 import schemas
 import crud
 import auth
+import migrations
 
-# Nom de la base de données
-DB_NAME = "./babyfoot_tournament.db"
+# Nom de la base de données (fichier de DATABASE_URL)
+DB_NAME = engine.url.database
 
-# Supprimer la base de données existante si elle existe
+# Supprimer la base de données existante si elle existe, avec ses fichiers WAL
 if os.path.exists(DB_NAME):
     os.remove(DB_NAME)
     print("Base de données existante supprimée.")
+for suffix in ("-wal", "-shm"):
+    if os.path.exists(DB_NAME + suffix):
+        os.remove(DB_NAME + suffix)
 
 # Recréer les tables
 models.Base.metadata.create_all(bind=engine)
 print("Tables créées avec succès.")
 
-# Ajouter manuellement la colonne is_admin à la table users
-conn = sqlite3.connect(DB_NAME)
-cursor = conn.cursor()
-try:
-    cursor.execute("ALTER TABLE users ADD COLUMN is_admin BOOLEAN DEFAULT 0")
-    conn.commit()
-    print("Colonne is_admin ajoutée à la table users.")
-except sqlite3.OperationalError:
-    print("La colonne is_admin existe déjà.")
-conn.close()
+# Enregistrer les migrations comme appliquées sur la nouvelle base
+migrations.run_migrations(engine)
 
 # Créer une session
 db = SessionLocal()
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+
+# Diffusion en mémoire des événements vers les flux SSE : modifications d'un
+# tournoi (GET /api/tournaments/{id}/events) et notifications d'un utilisateur
+# (GET /api/notifications/events). Un événement est mis en forme une seule
+# fois puis déposé dans la file de chaque client abonné : aucune requête n'est
+# faite par client. Comme le cache des réponses, la diffusion est propre au
+# processus : avec plusieurs workers, seuls les clients du worker qui a traité
+# l'écriture reçoivent l'événement.
+
+# Nombre d'événements en attente par client : un client plus lent est déconnecté
+# (le navigateur se reconnecte et recharge le tournoi)
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+# Intervalle (secondes) des commentaires envoyés pour garder la connexion ouverte
+KEEPALIVE_INTERVAL = float(os.getenv("EVENTS_KEEPALIVE_INTERVAL", "15"))
+
+# Commentaire SSE, ignoré par EventSource
+KEEPALIVE = b": keepalive\n\n"
+
+def format_event(event: str, data, event_id=None) -> bytes:
+    """
+    Message SSE : nom de l'événement, identifiant éventuel et données JSON.
+    """
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+class Subscription:
+    """
+    File d'un client abonné. None dans la file signale la fin du flux.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def push(self, message: bytes):
+        # Appelé dans la boucle d'événements du client
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.close()
+
+    def close(self):
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class Broker:
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics = defaultdict(set)
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, topic) -> Subscription:
+        """
+        Abonne un client ; doit être appelé depuis la boucle d'événements qui lira la file.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, topic, subscription: Subscription):
+        with self._lock:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def subscriber_count(self, topic) -> int:
+        with self._lock:
+            return len(self._topics.get(topic, ()))
+
+    def publish(self, topic, message: bytes):
+        """
+        Dépose message dans la file de chaque abonné. Peut être appelé depuis
+        n'importe quel thread : la livraison est faite par la boucle de chaque client.
+        """
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+            self.published += 1
+            self.delivered += len(subscribers)
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, loop_subscribers in by_loop.items():
+            loop.call_soon_threadsafe(_deliver, loop_subscribers, message)
+
+def _deliver(subscribers, message: bytes):
+    for subscription in subscribers:
+        subscription.push(message)
+
+broker = Broker()
+
+def tournament_topic(tournament_id: int):
+    return ("tournament", tournament_id)
+
+def user_topic(user_id: int):
+    return ("user", user_id)
+
+def has_subscribers(topic) -> bool:
+    return broker.subscriber_count(topic) > 0
+
+def publish_event(topic, event: str, data: dict, event_id=None):
+    broker.publish(topic, format_event(event, data, event_id=event_id))
+
+def publish_tournament_event(tournament_id: int, event: str, data: dict, version: int):
+    """
+    Publie un événement d'un tournoi ; l'identifiant SSE est la version du tournoi.
+    """
+    payload = {"tournament_id": tournament_id, "version": version, **data}
+    publish_event(tournament_topic(tournament_id), event, payload, event_id=version)
@@ -1,6 +1,14 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Form, Body
+from fastapi import FastAPI, HTTPException, Depends, status, Form, Body, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from functools import lru_cache
+import asyncio
+import hashlib
+import logging
+import math
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -8,13 +16,29 @@ from datetime import datetime, timedelta
 import models
 import schemas
 import crud
+import events
 import auth
-from database import engine, get_db
+import cache
+import metrics
+import migrations
+import pagination
+import profiling
+import ratelimit
+import ratings
+import retention
+import slow_queries
+import stats
+from database import SessionLocal, engine, get_db
 
-# Création des tables dans la base de données
+# Création des tables dans la base de données, puis application des migrations en attente
 models.Base.metadata.create_all(bind=engine)
+migrations.run_migrations(engine)
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="BabyFoot Tournament API")
+# Les routes synchrones (exécutées dans le pool de threads) sont aussi profilées
+app.router.route_class = profiling.ProfiledRoute
 
 # Configuration CORS pour permettre les requêtes du frontend
 app.add_middleware(
@@ -26,22 +50,172 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Profilage à la demande des requêtes d'un administrateur (paramètre profile=1 ou
+# en-tête X-Profile: 1) ; ajouté avant MetricsMiddleware pour s'exécuter sous lui
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# Durée des requêtes et requêtes SQL par route (GET /metrics, en-tête X-Query-Count)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+
+# Purge périodique des notifications lues anciennes, dans un thread pour ne pas
+# bloquer la boucle d'événements
+async def _purge_notifications_periodically():
+    while True:
+        try:
+            await asyncio.to_thread(retention.run_purge)
+        except Exception:
+            logger.exception("Erreur lors de la purge des notifications")
+        await asyncio.sleep(retention.NOTIFICATION_RETENTION_INTERVAL)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    if retention.NOTIFICATION_RETENTION_DAYS > 0 and retention.NOTIFICATION_RETENTION_INTERVAL > 0:
+        app.state.notification_purge = asyncio.create_task(_purge_notifications_periodically())
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    task = getattr(app.state, "notification_purge", None)
+    if task is not None:
+        task.cancel()
+
+@lru_cache(maxsize=None)
+def _type_adapter(schema):
+    return TypeAdapter(schema)
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """
+    Vrai si l'en-tête If-None-Match de la requête contient etag (ou "*").
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+# Le navigateur garde la réponse mais la revalide (If-None-Match) à chaque lecture
+REVALIDATE = "no-cache"
+
+def _not_modified(etag: str):
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+def cached_response(request: Request, key: tuple, schema, build, etag: Optional[str] = None):
+    """
+    Réponse JSON mise en cache (voir cache.py). build() n'est appelé qu'en cas
+    d'absence dans le cache ; ses exceptions (404...) ne sont pas mises en cache.
+
+    La réponse porte un ETag : etag s'il est fourni (version d'un tournoi), vérifié
+    avant toute lecture, sinon une empreinte du corps. Si le client a déjà cette
+    version (If-None-Match), la réponse est un 304 sans corps.
+    """
+    if etag is not None and _etag_matches(request, etag):
+        return _not_modified(etag)
+
+    body = cache.responses.get(key)
+    cache_status = "HIT"
+    if body is None:
+        cache_status = "MISS"
+        generation = cache.responses.generation
+        adapter = _type_adapter(schema)
+        body = adapter.dump_json(adapter.validate_python(build(), from_attributes=True))
+        cache.responses.set(key, body, generation)
+
+    if etag is None:
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE, "X-Cache": cache_status}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def event_stream(request: Request, topic, subscription: events.Subscription, first_message: bytes):
+    """
+    Réponse SSE : first_message, puis les événements publiés sur topic jusqu'à la
+    déconnexion du client, avec des commentaires réguliers pour garder la connexion.
+    """
+    async def stream():
+        try:
+            yield first_message
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), events.KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield events.KEEPALIVE
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            events.broker.unsubscribe(topic, subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def with_session(func, *args, **kwargs):
+    """
+    Appelle func(db, ...) avec une session courte, pour les routes async qui ne
+    gardent pas de session (flux SSE) ; à exécuter avec run_in_threadpool.
+    """
+    db = SessionLocal()
+    try:
+        return func(db, *args, **kwargs)
+    finally:
+        db.close()
+
+def get_tournament_version(db: Session, tournament_id: int) -> int:
+    """
+    Version d'un tournoi (404 s'il n'existe pas), pour l'ETag et la clé de cache de
+    ses ressources. Elle est lue avant le contenu : une réponse est donc toujours
+    au moins aussi récente que son ETag.
+    """
+    version = crud.get_tournament_version(db, tournament_id=tournament_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    return version
+
+def check_auth_rate(request: Request, route: str, username: str):
+    """
+    429 si l'adresse IP ou le nom d'utilisateur a dépassé sa limite, avant tout calcul bcrypt.
+    """
+    ip = request.client.host if request.client else "unknown"
+    retry_after = ratelimit.check_auth_rate(route, ip, username)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(min(retry_after, 3600)))},
+        )
+
 # Routes pour l'authentification
 @app.post("/api/auth/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def register(request: Request, user: schemas.UserCreate, db: Session = Depends(get_db)):
+    # Route async pour attendre le pool bcrypt sans occuper de thread : les requêtes
+    # SQL passent par le pool de threads de FastAPI
+    check_auth_rate(request, "register", user.username)
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    db_user = crud.get_user_by_username(db, username=user.username)
+    db_user = await run_in_threadpool(crud.get_user_by_username, db, username=user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    return crud.create_user(db=db, user=user)
+    hashed_password = await auth.get_password_hash_async(user.password)
+    db_user = await run_in_threadpool(crud.create_user, db, user=user, hashed_password=hashed_password)
+    return await run_in_threadpool(schemas.User.model_validate, db_user, from_attributes=True)
 
 @app.post("/api/auth/login", response_model=schemas.Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = auth.authenticate_user(db, form_data.username, form_data.password)
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    check_auth_rate(request, "login", form_data.username)
+    user = await auth.authenticate(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,36 +223,65 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    refresh_token = await run_in_threadpool(crud.create_refresh_token, db, user_id=user.id)
+    return _token_response(user, refresh_token)
+
+# Nouveau jeton d'accès sans mot de passe : le jeton de rafraîchissement est remplacé
+@app.post("/api/auth/refresh", response_model=schemas.Token)
+def refresh_access_token(request: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    rotated = crud.rotate_refresh_token(db, token=request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user, refresh_token = rotated
+    return _token_response(user, refresh_token)
+
+@app.post("/api/auth/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(request: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    crud.revoke_refresh_token(db, token=request.refresh_token)
+
+def _token_response(user: models.User, refresh_token: str):
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
 # Routes pour les équipes
-@app.get("/api/teams", response_model=List[schemas.Team])
-async def get_teams(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    teams = crud.get_teams(db, skip=skip, limit=limit)
-    return teams
+@app.get("/api/teams", response_model=schemas.TeamPage)
+def get_teams(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        teams, next_cursor = crud.get_teams(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": teams, "next_cursor": next_cursor}
 
 @app.get("/api/teams/{team_id}", response_model=schemas.Team)
-async def get_team(team_id: int, db: Session = Depends(get_db)):
+def get_team(team_id: int, db: Session = Depends(get_db)):
     db_team = crud.get_team(db, team_id=team_id)
     if db_team is None:
         raise HTTPException(status_code=404, detail="Team not found")
     return db_team
 
 @app.post("/api/teams", response_model=schemas.Team, status_code=status.HTTP_201_CREATED)
-async def create_team(
+def create_team(
     team: schemas.TeamCreate, 
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
-    return crud.create_team(db=db, team=team, user_id=current_user.id)
+    return crud.create_team(db, team=team, user_id=current_user.id)
 
 @app.put("/api/teams/{team_id}", response_model=schemas.Team)
-async def update_team(
+def update_team(
     team_id: int, 
     team: schemas.TeamBase, 
     current_user: models.User = Depends(auth.get_current_user),
@@ -91,10 +294,10 @@ async def update_team(
     if db_team.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return crud.update_team(db=db, team_id=team_id, team=team)
+    return crud.update_team(db, team_id=team_id, team=team)
 
 @app.delete("/api/teams/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_team(
+def delete_team(
     team_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
@@ -106,11 +309,11 @@ async def delete_team(
     if db_team.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    crud.delete_team(db=db, team_id=team_id)
+    crud.delete_team(db, team_id=team_id)
     return None
 
 @app.post("/api/teams/{team_id}/players", response_model=schemas.Player)
-async def add_player(
+def add_player(
     team_id: int, 
     player: schemas.PlayerCreate, 
     current_user: models.User = Depends(auth.get_current_user),
@@ -123,10 +326,10 @@ async def add_player(
     if db_team.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return crud.create_player(db=db, player=player, team_id=team_id)
+    return crud.create_player(db, player=player, team_id=team_id)
 
 @app.put("/api/teams/{team_id}/players/{player_id}", response_model=schemas.Player)
-async def update_player(
+def update_player(
     team_id: int, 
     player_id: int, 
     player: schemas.PlayerBase, 
@@ -147,10 +350,10 @@ async def update_player(
     if db_player.team_id != team_id:
         raise HTTPException(status_code=400, detail="Player does not belong to this team")
     
-    return crud.update_player(db=db, player_id=player_id, player=player)
+    return crud.update_player(db, player_id=player_id, player=player)
 
 @app.delete("/api/teams/{team_id}/players/{player_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_player(
+def delete_player(
     team_id: int, 
     player_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
@@ -170,32 +373,47 @@ async def delete_player(
     if db_player.team_id != team_id:
         raise HTTPException(status_code=400, detail="Player does not belong to this team")
     
-    crud.delete_player(db=db, player_id=player_id)
+    crud.delete_player(db, player_id=player_id)
     return None
 
 # Routes pour les tournois
-@app.get("/api/tournaments", response_model=List[schemas.Tournament])
-async def get_tournaments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tournaments = crud.get_tournaments(db, skip=skip, limit=limit)
-    return tournaments
+@app.get("/api/tournaments", response_model=schemas.TournamentPage)
+def get_tournaments(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        tournaments, next_cursor = crud.get_tournaments(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": tournaments, "next_cursor": next_cursor}
 
 @app.get("/api/tournaments/{tournament_id}", response_model=schemas.Tournament)
-async def get_tournament(tournament_id: int, db: Session = Depends(get_db)):
-    db_tournament = crud.get_tournament(db, tournament_id=tournament_id)
-    if db_tournament is None:
-        raise HTTPException(status_code=404, detail="Tournament not found")
-    return db_tournament
+def get_tournament(tournament_id: int, request: Request, db: Session = Depends(get_db)):
+    version = get_tournament_version(db, tournament_id)
+
+    def build():
+        db_tournament = crud.get_tournament_details(db, tournament_id=tournament_id)
+        if db_tournament is None:
+            raise HTTPException(status_code=404, detail="Tournament not found")
+        return db_tournament
+
+    return cached_response(
+        request, ("tournament", tournament_id, version), schemas.Tournament, build,
+        etag=f'"tournament-{tournament_id}-{version}"',
+    )
 
 @app.post("/api/tournaments", response_model=schemas.Tournament, status_code=status.HTTP_201_CREATED)
-async def create_tournament(
+def create_tournament(
     tournament: schemas.TournamentCreate, 
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
-    return crud.create_tournament(db=db, tournament=tournament, user_id=current_user.id)
+    return crud.create_tournament(db, tournament=tournament, user_id=current_user.id)
 
 @app.put("/api/tournaments/{tournament_id}", response_model=schemas.Tournament)
-async def update_tournament(
+def update_tournament(
     tournament_id: int, 
     tournament: schemas.TournamentBase, 
     current_user: models.User = Depends(auth.get_current_user),
@@ -205,10 +423,10 @@ async def update_tournament(
     if db_tournament is None:
         raise HTTPException(status_code=404, detail="Tournament not found")
     
-    return crud.update_tournament(db=db, tournament_id=tournament_id, tournament=tournament)
+    return crud.update_tournament(db, tournament_id=tournament_id, tournament=tournament)
 
 @app.delete("/api/tournaments/{tournament_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_tournament(
+def delete_tournament(
     tournament_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
@@ -217,11 +435,11 @@ async def delete_tournament(
     if db_tournament is None:
         raise HTTPException(status_code=404, detail="Tournament not found")
     
-    crud.delete_tournament(db=db, tournament_id=tournament_id)
+    crud.delete_tournament(db, tournament_id=tournament_id)
     return None
 
 @app.post("/api/tournaments/{tournament_id}/teams/{team_id}", status_code=status.HTTP_200_OK)
-async def join_tournament(
+def join_tournament(
     tournament_id: int, 
     team_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
@@ -241,14 +459,14 @@ async def join_tournament(
     if db_tournament.status != "open":
         raise HTTPException(status_code=400, detail="Tournament is not open for registration")
     
-    success = crud.join_tournament(db=db, tournament_id=tournament_id, team_id=team_id)
+    success = crud.join_tournament(db, tournament_id=tournament_id, team_id=team_id)
     if not success:
         raise HTTPException(status_code=400, detail="Failed to join tournament")
     
     return {"message": "Team added to tournament successfully"}
 
 @app.delete("/api/tournaments/{tournament_id}/teams/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def leave_tournament(
+def leave_tournament(
     tournament_id: int, 
     team_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
@@ -268,11 +486,11 @@ async def leave_tournament(
     if db_tournament.status != "open":
         raise HTTPException(status_code=400, detail="Tournament is not open for registration")
     
-    crud.leave_tournament(db=db, tournament_id=tournament_id, team_id=team_id)
+    crud.leave_tournament(db, tournament_id=tournament_id, team_id=team_id)
     return None
 
 @app.post("/api/tournaments/{tournament_id}/start", status_code=status.HTTP_200_OK)
-async def start_tournament(
+def start_tournament(
     tournament_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
@@ -294,20 +512,27 @@ async def start_tournament(
             )
         
         # Vérifier qu'il y a au moins une équipe
-        if len(db_tournament.teams) < 1:
+        team_count = len(db_tournament.teams)
+        if team_count < 1:
             raise HTTPException(
                 status_code=400, 
                 detail="Tournament cannot be started with less than 1 team"
             )
         
-        matches = crud.start_tournament(db=db, tournament_id=tournament_id)
+        matches = crud.start_tournament(db, tournament_id=tournament_id)
         if not matches:
             raise HTTPException(
                 status_code=400, 
                 detail="Failed to start tournament. No matches were created."
             )
         
-        return {"message": "Tournament started successfully", "matches": matches}
+        # Statut et version après le démarrage : le client les applique sans recharger le tournoi
+        return {
+            "message": "Tournament started successfully",
+            "status": db_tournament.status,
+            "version": db_tournament.version,
+            "matches": [schemas.Match.model_validate(match, from_attributes=True) for match in matches],
+        }
     except HTTPException:
         # Relancer les exceptions HTTP déjà formatées
         raise
@@ -325,15 +550,38 @@ async def start_tournament(
 
 # Routes pour les matchs
 @app.get("/api/tournaments/{tournament_id}/matches", response_model=List[schemas.Match])
-async def get_tournament_matches(tournament_id: int, db: Session = Depends(get_db)):
-    db_tournament = crud.get_tournament(db, tournament_id=tournament_id)
-    if db_tournament is None:
-        raise HTTPException(status_code=404, detail="Tournament not found")
-    
-    return crud.get_tournament_matches(db=db, tournament_id=tournament_id)
+def get_tournament_matches(tournament_id: int, request: Request, db: Session = Depends(get_db)):
+    version = get_tournament_version(db, tournament_id)
+
+    def build():
+        return crud.get_tournament_matches(db, tournament_id=tournament_id)
+
+    return cached_response(
+        request, ("tournament_matches", tournament_id, version), List[schemas.Match], build,
+        etag=f'"matches-{tournament_id}-{version}"',
+    )
 
-@app.put("/api/matches/{match_id}", response_model=schemas.Match)
-async def update_match_score(
+# Flux SSE des modifications d'un tournoi (voir events.py). Le premier événement,
+# "sync", donne la version courante : un client qui a une autre version (après une
+# reconnexion) recharge le tournoi. Ensuite, "matches" contient les matchs modifiés
+# par un score et "tournament" le nouveau statut (et tout le tableau au démarrage).
+@app.get("/api/tournaments/{tournament_id}/events")
+async def tournament_events(tournament_id: int, request: Request):
+    topic = events.tournament_topic(tournament_id)
+    # Abonnement avant la lecture de la version : aucune modification n'est perdue
+    subscription = events.broker.subscribe(topic)
+    try:
+        # Session courte : aucune connexion n'est gardée pendant la durée du flux
+        version = await run_in_threadpool(with_session, get_tournament_version, tournament_id)
+    except HTTPException:
+        events.broker.unsubscribe(topic, subscription)
+        raise
+
+    first_message = events.format_event("sync", {"tournament_id": tournament_id, "version": version}, event_id=version)
+    return event_stream(request, topic, subscription, first_message)
+
+@app.put("/api/matches/{match_id}", response_model=schemas.MatchScoreUpdate)
+def update_match_score(
     match_id: str, 
     team1_score: int = Body(...), 
     team2_score: int = Body(...), 
@@ -364,9 +612,10 @@ async def update_match_score(
         if team1_score < 0 or team2_score < 0:
             raise HTTPException(status_code=400, detail="Scores cannot be negative")
         
-        # Mettre à jour le score
-        updated_match = crud.update_match_score(db=db, match_id=match_id, team1_score=team1_score, team2_score=team2_score)
-        return updated_match
+        # Mettre à jour le score et renvoyer tous les matchs modifiés en une seule réponse
+        updated_matches = crud.update_match_score(db, match_id=match_id, team1_score=team1_score, team2_score=team2_score)
+        db_match = schemas.Match.model_validate(updated_matches[0], from_attributes=True)
+        return {**db_match.model_dump(), "updated_matches": updated_matches}
     
     except ValueError as e:
         # Capturer les erreurs de validation de la fonction crud
@@ -381,21 +630,125 @@ async def update_match_score(
         raise HTTPException(status_code=500, detail=f"Une erreur s'est produite lors de la mise à jour du score: {str(e)}")
 
 # Routes pour le classement
-@app.get("/api/scoreboard/teams", response_model=List[schemas.ScoreboardTeam])
-async def get_team_rankings(db: Session = Depends(get_db)):
-    return crud.get_team_rankings(db=db)
+# Ordre des classements : "rating" (classement Elo) ou "wins" (victoires)
+RANKING_ORDER = Query("rating", pattern="^(rating|wins)$")
+
+@app.get("/api/scoreboard/teams", response_model=schemas.ScoreboardTeamPage)
+def get_team_rankings(
+    request: Request,
+    by: str = RANKING_ORDER,
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    def build():
+        try:
+            teams, next_cursor = crud.get_team_rankings(db, by=by, cursor=cursor, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": teams, "next_cursor": next_cursor}
 
-@app.get("/api/scoreboard/players", response_model=List[schemas.ScoreboardPlayer])
-async def get_player_rankings(db: Session = Depends(get_db)):
-    return crud.get_player_rankings(db=db)
+    return cached_response(request, ("scoreboard", "teams", by, cursor, limit), schemas.ScoreboardTeamPage, build)
+
+@app.get("/api/scoreboard/teams/{team_id}", response_model=schemas.ScoreboardTeam)
+def get_team_rank(team_id: int, request: Request, by: str = RANKING_ORDER, db: Session = Depends(get_db)):
+    def build():
+        team = crud.get_team_rank(db, team_id=team_id, by=by)
+        if team is None:
+            raise HTTPException(status_code=404, detail="Team not found")
+        return team
+
+    return cached_response(request, ("scoreboard", "team", team_id, by), schemas.ScoreboardTeam, build)
+
+@app.get("/api/scoreboard/players", response_model=schemas.ScoreboardPlayerPage)
+def get_player_rankings(
+    request: Request,
+    by: str = RANKING_ORDER,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    def build():
+        try:
+            players, next_cursor = crud.get_player_rankings(db, by=by, cursor=cursor, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": players, "next_cursor": next_cursor}
+
+    return cached_response(request, ("scoreboard", "players", by, cursor, limit), schemas.ScoreboardPlayerPage, build)
+
+# Recalcul complet des classements Elo (après un changement de règles)
+@app.post("/api/admin/ratings/recompute")
+def recompute_ratings(
+    current_user: models.User = Depends(auth.get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    teams, players, matches = ratings.recompute_ratings(db)
+    return {"teams": teams, "players": players, "matches": matches}
+
+@app.post("/api/admin/stats/rebuild")
+def rebuild_stats(
+    current_user: models.User = Depends(auth.get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    return stats.rebuild_stats(db)
+
+# Purge immédiate des notifications lues (older_than_days=0 : toutes les lues)
+@app.post("/api/admin/notifications/purge")
+def purge_notifications(
+    older_than_days: int = Query(retention.NOTIFICATION_RETENTION_DAYS, ge=0),
+    current_user: models.User = Depends(auth.get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    return retention.purge_read_notifications(db, max_age_days=older_than_days)
+
+# Compteurs du cache des réponses
+@app.get("/api/admin/cache")
+async def get_cache_stats(current_user: models.User = Depends(auth.get_current_admin_user)):
+    return cache.responses.stats()
+
+# Requêtes SQL lentes, avec leurs paramètres et leur plan d'exécution
+@app.get("/api/admin/slow-queries")
+async def get_slow_queries(current_user: models.User = Depends(auth.get_current_admin_user)):
+    return slow_queries.log.entries()
+
+# Mesures au format texte de Prometheus
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# Compteurs des limites de connexion et d'inscription
+@app.get("/api/admin/rate-limits")
+async def get_rate_limit_stats(current_user: models.User = Depends(auth.get_current_admin_user)):
+    return ratelimit.stats()
+
+# Compteurs du cache des identités (utilisateurs authentifiés)
+@app.get("/api/admin/cache/identities")
+async def get_identity_cache_stats(current_user: models.User = Depends(auth.get_current_admin_user)):
+    return cache.identities.stats()
 
 # Routes pour le profil utilisateur
-@app.get("/api/users", response_model=List[schemas.User])
-async def get_users(db: Session = Depends(get_db)):
-    return crud.get_users(db)
+@app.get("/api/users", response_model=schemas.UserPage)
+def get_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        users, next_cursor = crud.get_users(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": users, "next_cursor": next_cursor}
+
+@app.get("/api/users/me", response_model=schemas.User)
+def get_current_user_profile(
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    return crud.get_user(db, user_id=current_user.id)
 
 @app.get("/api/users/{user_id}", response_model=schemas.User)
-async def get_user_profile(
+def get_user_profile(
     user_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
@@ -425,18 +778,41 @@ async def get_user_profile(
     raise HTTPException(status_code=403, detail="Not enough permissions")
 
 @app.get("/api/users/{user_id}/matches")
-async def get_user_matches(
+def get_user_matches(
     user_id: int, 
+    tournament_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    result: Optional[str] = Query(None, pattern="^(win|loss|pending)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
     if user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return crud.get_user_matches(db=db, user_id=user_id)
+    try:
+        matches, next_cursor = crud.get_user_matches(
+            db, user_id=user_id, tournament_id=tournament_id, date_from=date_from,
+            date_to=date_to, result=result, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": matches, "next_cursor": next_cursor}
+
+@app.get("/api/users/{user_id}/match-stats", response_model=schemas.UserMatchStats)
+def get_user_match_stats(
+    user_id: int,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    if user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return crud.get_user_match_stats(db, user_id=user_id)
 
 @app.get("/api/users/{user_id}/teams", response_model=List[schemas.Team])
-async def get_user_teams(
+def get_user_teams(
     user_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
@@ -444,7 +820,7 @@ async def get_user_teams(
     if user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return crud.get_user_teams(db=db, user_id=user_id)
+    return crud.get_user_teams(db, user_id=user_id)
 
 @app.put("/api/users/{user_id}", response_model=schemas.User)
 async def update_user(
@@ -456,21 +832,24 @@ async def update_user(
     if user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db_user = crud.update_user(db=db, user_id=user_id, user=user_update)
+    hashed_password = None
+    if user_update.password is not None:
+        hashed_password = await auth.get_password_hash_async(user_update.password)
+    db_user = await run_in_threadpool(crud.update_user, db, user_id=user_id, user=user_update, hashed_password=hashed_password)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return db_user
+    return await run_in_threadpool(schemas.User.model_validate, db_user, from_attributes=True)
 
 # Route pour vérifier si un utilisateur existe
 @app.get("/api/users/check/{username}")
-async def check_username(username: str, db: Session = Depends(get_db)):
+def check_username(username: str, db: Session = Depends(get_db)):
     user = crud.check_user_exists(db, username=username)
     return {"exists": user is not None}
 
 # Routes pour les invitations de joueurs
 @app.post("/api/teams/{team_id}/invite", response_model=schemas.Player)
-async def invite_player(
+def invite_player(
     team_id: int, 
     username: str = Body(..., embed=True), 
     current_user: models.User = Depends(auth.get_current_user),
@@ -492,41 +871,100 @@ async def invite_player(
     return player
 
 # Routes pour les notifications
-@app.get("/api/users/{user_id}/notifications", response_model=List[schemas.Notification])
-async def get_notifications(
+@app.get("/api/users/{user_id}/notifications", response_model=schemas.NotificationPage)
+def get_notifications(
+    user_id: int,
+    unread_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    if user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    try:
+        notifications, next_cursor = crud.get_user_notifications(
+            db, user_id=user_id, unread_only=unread_only, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": notifications, "next_cursor": next_cursor}
+
+@app.put("/api/users/{user_id}/notifications/read")
+def mark_notifications_read(
     user_id: int,
+    notifications: schemas.NotificationsRead = Body(default=schemas.NotificationsRead()),
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
     if user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return crud.get_user_notifications(db, user_id=user_id)
+    updated = crud.mark_notifications_as_read(db, user_id=user_id, notification_ids=notifications.ids)
+    return {"updated": updated}
+
+@app.get("/api/users/{user_id}/notifications/unread-count")
+def get_unread_notification_count(
+    user_id: int,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    if user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return {"count": crud.count_unread_notifications(db, user_id=user_id)}
+
+# Flux SSE des notifications de l'utilisateur connecté (voir events.py) : "unread"
+# (nombre de notifications non lues, envoyé dès la connexion puis à chaque
+# changement) et "notification" (nouvelle notification). EventSource ne peut pas
+# envoyer d'en-tête Authorization : le flux est ouvert avec un ticket à usage
+# unique, demandé avec le jeton d'accès (voir auth.create_stream_ticket).
+@app.post("/api/notifications/events/ticket")
+def create_notification_events_ticket(current_user: models.User = Depends(auth.get_current_user)):
+    return {"ticket": auth.create_stream_ticket(current_user.id), "expires_in": auth.STREAM_TICKET_EXPIRE_SECONDS}
+
+@app.get("/api/notifications/events")
+async def notification_events(request: Request, ticket: str = Query(...)):
+    user_id = auth.consume_stream_ticket(ticket)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+    topic = events.user_topic(user_id)
+    # Abonnement avant le comptage : aucune notification n'est perdue
+    subscription = events.broker.subscribe(topic)
+    try:
+        # Session courte : aucune connexion n'est gardée pendant la durée du flux
+        unread = await run_in_threadpool(with_session, crud.count_unread_notifications, user_id=user_id)
+    except Exception:
+        events.broker.unsubscribe(topic, subscription)
+        raise
+
+    return event_stream(request, topic, subscription, events.format_event("unread", {"count": unread}))
 
 @app.put("/api/notifications/{notification_id}/read", response_model=schemas.Notification)
-async def mark_notification_read(
+def mark_notification_read(
     notification_id: int,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
-    notification = crud.mark_notification_as_read(db, notification_id=notification_id)
+    notification = crud.get_notification(db, notification_id=notification_id)
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
     if notification.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return notification
+    return crud.mark_notification_as_read(db, notification_id=notification_id)
 
 # Route pour répondre à une invitation d'équipe
 @app.put("/api/players/{player_id}/respond", response_model=schemas.Player)
-async def respond_to_invitation(
+def respond_to_invitation(
     player_id: int,
     accept: bool = Body(..., embed=True),
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
-    player = db.query(models.Player).filter(models.Player.id == player_id).first()
+    player = crud.get_player(db, player_id=player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
@@ -536,7 +974,7 @@ async def respond_to_invitation(
     return crud.respond_to_team_invitation(db, player_id=player_id, accept=accept)
 
 @app.get("/api/players/{player_id}", response_model=schemas.Player)
-async def get_player(
+def get_player(
     player_id: int,
     db: Session = Depends(get_db)
 ):
@@ -546,15 +984,14 @@ async def get_player(
     return player
 
 @app.get("/api/players/{player_id}/teams", response_model=List[schemas.Team])
-async def get_player_teams(
+def get_player_teams(
     player_id: int,
     db: Session = Depends(get_db)
 ):
-    teams = crud.get_player_teams(db, player_id=player_id)
-    return teams
+    return crud.get_player_teams(db, player_id=player_id)
 
 @app.post("/api/tournaments/{tournament_id}/check-completed", status_code=status.HTTP_200_OK)
-async def check_tournament_completed_endpoint(
+def check_tournament_completed_endpoint(
     tournament_id: int, 
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
@@ -598,7 +1035,7 @@ async def check_tournament_completed_endpoint(
         )
 
 @app.get("/api/teams/{team_id}/tournaments", response_model=List[schemas.Tournament])
-async def get_team_tournaments(
+def get_team_tournaments(
     team_id: int,
     db: Session = Depends(get_db)
 ):
@@ -608,12 +1045,17 @@ async def get_team_tournaments(
         raise HTTPException(status_code=404, detail="Team not found")
     
     # Récupérer les tournois de l'équipe
-    tournaments = crud.get_team_tournaments(db, team_id=team_id)
-    return tournaments
+    return crud.get_team_tournaments(db, team_id=team_id)
 
 @app.get("/api/teams/{team_id}/matches")
-async def get_team_matches(
+def get_team_matches(
     team_id: int,
+    tournament_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    result: Optional[str] = Query(None, pattern="^(win|loss|pending)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     # Vérifier que l'équipe existe
@@ -622,8 +1064,14 @@ async def get_team_matches(
         raise HTTPException(status_code=404, detail="Team not found")
     
     # Récupérer les matchs de l'équipe
-    matches = crud.get_team_matches(db, team_id=team_id)
-    return matches
+    try:
+        matches, next_cursor = crud.get_team_matches(
+            db, team_id=team_id, tournament_id=tournament_id, date_from=date_from,
+            date_to=date_to, result=result, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": matches, "next_cursor": next_cursor}
 
 if __name__ == "__main__":
     import uvicorn
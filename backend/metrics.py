@@ -0,0 +1,197 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+# Mesures par route exposées au format texte de Prometheus (GET /metrics) : durée
+# des requêtes, nombre de requêtes SQL et temps passé dans la base. Les requêtes
+# SQL sont comptées par les événements des moteurs SQLAlchemy et rattachées à la
+# requête HTTP en cours ; l'en-tête X-Query-Count de chaque réponse donne leur
+# nombre, ce qui rend visibles les requêtes N+1. Les mesures sont propres au
+# processus, comme le cache des réponses.
+
+# Bornes (secondes) de l'histogramme des durées de requêtes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bornes de l'histogramme du nombre de requêtes SQL par requête HTTP
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+class RequestStats:
+    """
+    Requêtes SQL de la requête HTTP en cours.
+    """
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+_current_request = ContextVar("current_request", default=None)
+
+def current_request_stats():
+    """
+    Requêtes SQL de la requête HTTP en cours (None hors requête).
+    """
+    return _current_request.get()
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Un compteur par borne, plus un pour les valeurs au-delà de la dernière
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.query_counts = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.db_time = defaultdict(float)
+        self.responses = defaultdict(int)
+        # Requêtes SQL hors requête HTTP (migrations, tâches de fond)
+        self.background_queries = 0
+        self.background_db_time = 0.0
+
+    def record(self, method: str, route: str, status_code: int, duration: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.latency[key].observe(duration)
+            self.query_counts[key].observe(stats.queries)
+            self.db_time[key] += stats.db_time
+            self.responses[(method, route, status_code)] += 1
+
+    def record_background_query(self, duration: float):
+        with self._lock:
+            self.background_queries += 1
+            self.background_db_time += duration
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP http_request_duration_seconds Request latency by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines.extend(histogram.render("http_request_duration_seconds", _labels(method=method, route=route)))
+
+            lines += ["# HELP http_requests_total Responses by route and status.", "# TYPE http_requests_total counter"]
+            for (method, route, status_code), count in sorted(self.responses.items()):
+                lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status_code)}}} {count}")
+
+            lines += [
+                "# HELP db_queries_per_request SQL statements executed per request, by route.",
+                "# TYPE db_queries_per_request histogram",
+            ]
+            for (method, route), histogram in sorted(self.query_counts.items()):
+                lines.extend(histogram.render("db_queries_per_request", _labels(method=method, route=route)))
+
+            lines += [
+                "# HELP db_query_duration_seconds_total Time spent in SQL statements, by route.",
+                "# TYPE db_query_duration_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self.db_time.items()):
+                lines.append(f"db_query_duration_seconds_total{{{_labels(method=method, route=route)}}} {seconds}")
+
+            lines += [
+                "# HELP db_background_queries_total SQL statements executed outside HTTP requests.",
+                "# TYPE db_background_queries_total counter",
+                f"db_background_queries_total {self.background_queries}",
+                "# HELP db_background_query_duration_seconds_total Time spent in SQL statements outside HTTP requests.",
+                "# TYPE db_background_query_duration_seconds_total counter",
+                f"db_background_query_duration_seconds_total {self.background_db_time}",
+            ]
+        return "\n".join(lines) + "\n"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def _labels(**labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+registry = Registry()
+
+# Événements SQLAlchemy : durée de chaque requête SQL
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._metrics_start
+    stats = _current_request.get()
+    if stats is None:
+        registry.record_background_query(duration)
+        return
+    stats.queries += 1
+    stats.db_time += duration
+
+def instrument_engine(sync_engine):
+    """
+    Compte les requêtes SQL d'un moteur.
+    """
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+# Chemin déclaré de chaque route ("/api/teams/{team_id}"), par fonction de route
+_route_paths = {}
+
+def _route_path(scope) -> str:
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "<unmatched>"
+    if endpoint not in _route_paths:
+        for route in scope["app"].routes:
+            if hasattr(route, "endpoint"):
+                _route_paths[route.endpoint] = route.path
+    return _route_paths.get(endpoint, "<unmatched>")
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : mesure chaque requête HTTP et ajoute l'en-tête X-Query-Count.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_query_count(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Query-Count", str(stats.queries))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_query_count)
+        finally:
+            _current_request.reset(token)
+            registry.record(scope["method"], _route_path(scope), status_code, time.perf_counter() - start, stats)
@@ -0,0 +1,219 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, bindparam, inspect, text
+
+from database import engine
+
+# Migrations versionnées du schéma de la base de données.
+# Chaque migration est appliquée une seule fois, dans sa propre transaction,
+# et sa version est enregistrée dans la table schema_migrations.
+
+# Taille des lots pour les remplissages de données : chaque lot est validé
+# séparément pour ne jamais garder le verrou d'écriture longtemps
+BACKFILL_BATCH_SIZE = 500
+
+migrations_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migrations_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String),
+    Column("applied_at", DateTime),
+)
+
+def _add_column(conn, table: str, column: str, definition: str):
+    """
+    Ajoute une colonne si elle n'existe pas déjà (les anciennes bases peuvent l'avoir).
+    """
+    columns = [c["name"] for c in inspect(conn).get_columns(table)]
+    if column not in columns:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+
+def _backfill_in_batches(bind, table: str, key: str, update_sql: str, batch_size: int = BACKFILL_BATCH_SIZE):
+    """
+    Exécute update_sql par lots de batch_size clés primaires, avec un commit par lot.
+    update_sql doit restreindre les lignes modifiées avec "<clé> IN :keys".
+    Renvoie le nombre de lignes modifiées.
+    """
+    statement = text(update_sql).bindparams(bindparam("keys", expanding=True))
+    updated = 0
+    last_key = None
+    while True:
+        with bind.begin() as conn:
+            query = f"SELECT {key} FROM {table}"
+            params = {"limit": batch_size}
+            if last_key is not None:
+                query += f" WHERE {key} > :last_key"
+                params["last_key"] = last_key
+            keys = conn.execute(text(f"{query} ORDER BY {key} LIMIT :limit"), params).scalars().all()
+            if not keys:
+                return updated
+
+            updated += conn.execute(statement, {"keys": keys}).rowcount
+            last_key = keys[-1]
+
+# Migrations 1 à 3 : anciennes modifications faites par des scripts ponctuels
+def add_team_losses(bind):
+    with bind.begin() as conn:
+        _add_column(conn, "teams", "losses", "INTEGER DEFAULT 0")
+
+def add_team_tournaments_won(bind):
+    with bind.begin() as conn:
+        _add_column(conn, "teams", "tournaments_won", "INTEGER DEFAULT 0")
+
+def add_user_is_admin(bind):
+    with bind.begin() as conn:
+        _add_column(conn, "users", "is_admin", "BOOLEAN DEFAULT 0")
+
+# Migration 4 : index des filtres les plus fréquents de crud.py
+def add_hot_path_indexes(bind):
+    with bind.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_matches_team1_id ON matches (team1_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_matches_team2_id ON matches (team2_id)"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_matches_tournament_round_match "
+            "ON matches (tournament_id, round, match_number)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_notifications_user_id_is_read ON notifications (user_id, is_read)"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_players_team_id_user_id ON players (team_id, user_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tournament_team_team_id ON tournament_team (team_id)"))
+
+# Migration 5 : liens explicites vers le match suivant
+def add_next_match_links(bind):
+    with bind.begin() as conn:
+        _add_column(conn, "matches", "next_match_id", "VARCHAR REFERENCES matches(id)")
+        _add_column(conn, "matches", "next_match_slot", "VARCHAR")
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_matches_next_match_id ON matches (next_match_id)"))
+
+    # Relier chaque match au match du tour suivant : les matchs impairs alimentent team1, les pairs team2
+    updated = _backfill_in_batches(bind, "matches", "id", """
+        UPDATE matches
+        SET next_match_id = (
+                SELECT n.id FROM matches AS n
+                WHERE n.tournament_id = matches.tournament_id
+                  AND n.round = matches.round + 1
+                  AND n.match_number = (matches.match_number + 1) / 2
+            ),
+            next_match_slot = CASE WHEN match_number % 2 = 1 THEN 'team1' ELSE 'team2' END
+        WHERE id IN :keys AND next_match_id IS NULL
+    """)
+    with bind.begin() as conn:
+        conn.execute(text(
+            "UPDATE matches SET next_match_slot = NULL WHERE next_match_id IS NULL AND next_match_slot IS NOT NULL"
+        ))
+    print(f"{updated} match(s) mis à jour avec leur lien vers le tour suivant.")
+
+# Migration 6 : index des classements
+def add_ranking_indexes(bind):
+    with bind.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_teams_ranking ON teams (wins, tournaments_won, id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_players_ranking ON players (wins, id)"))
+
+# Migration 7 : classements Elo, calculés à partir de l'historique des matchs
+def add_ratings(bind):
+    import ratings
+    from sqlalchemy.orm import Session
+
+    with bind.begin() as conn:
+        _add_column(conn, "teams", "rating", f"FLOAT DEFAULT {ratings.INITIAL_RATING}")
+        _add_column(conn, "players", "rating", f"FLOAT DEFAULT {ratings.INITIAL_RATING}")
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_teams_rating ON teams (rating, id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_players_rating ON players (rating, id)"))
+
+    with Session(bind=bind) as db:
+        teams, players, matches = ratings.recompute_ratings(db)
+    print(f"{matches} match(s) rejoué(s) pour le classement de {teams} équipe(s) et {players} joueur(s).")
+
+# Migration 8 : version des tournois, pour les ETag des routes de lecture
+def add_tournament_version(bind):
+    with bind.begin() as conn:
+        _add_column(conn, "tournaments", "version", "INTEGER DEFAULT 0")
+
+# Migration 9 : index de la liste paginée des notifications (remplace celui de la migration 4)
+def add_notification_listing_index(bind):
+    with bind.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_notifications_user_read_created "
+            "ON notifications (user_id, is_read, created_at)"
+        ))
+        conn.execute(text("DROP INDEX IF EXISTS ix_notifications_user_id_is_read"))
+
+# Migration 10 : index de la purge des notifications lues (retention.py)
+def add_notification_retention_index(bind):
+    with bind.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_notifications_read_created "
+            "ON notifications (is_read, created_at)"
+        ))
+
+# Migration 11 : date d'échange des jetons de rafraîchissement (délai de grâce entre onglets)
+def add_refresh_token_rotated_at(bind):
+    with bind.begin() as conn:
+        _add_column(conn, "refresh_tokens", "rotated_at", "VARCHAR")
+
+# Migration 12 : variation de classement de chaque match, annulée lors d'une correction
+def add_match_rating_delta(bind):
+    import ratings
+    from sqlalchemy.orm import Session
+
+    with bind.begin() as conn:
+        _add_column(conn, "matches", "rating_delta", "FLOAT")
+
+    with Session(bind=bind) as db:
+        teams, players, matches = ratings.recompute_ratings(db)
+    print(f"{matches} match(s) rejoué(s) pour le classement de {teams} équipe(s) et {players} joueur(s).")
+
+MIGRATIONS = [
+    (1, "add_team_losses", add_team_losses),
+    (2, "add_team_tournaments_won", add_team_tournaments_won),
+    (3, "add_user_is_admin", add_user_is_admin),
+    (4, "add_hot_path_indexes", add_hot_path_indexes),
+    (5, "add_next_match_links", add_next_match_links),
+    (6, "add_ranking_indexes", add_ranking_indexes),
+    (7, "add_ratings", add_ratings),
+    (8, "add_tournament_version", add_tournament_version),
+    (9, "add_notification_listing_index", add_notification_listing_index),
+    (10, "add_notification_retention_index", add_notification_retention_index),
+    (11, "add_refresh_token_rotated_at", add_refresh_token_rotated_at),
+    (12, "add_match_rating_delta", add_match_rating_delta),
+]
+
+def get_applied_versions(bind):
+    migrations_metadata.create_all(bind=bind)
+    with bind.connect() as conn:
+        return set(conn.execute(schema_migrations.select().with_only_columns(schema_migrations.c.version)).scalars())
+
+def run_migrations(bind=engine):
+    """
+    Applique, dans l'ordre, les migrations qui n'ont pas encore été enregistrées.
+    Les tables doivent déjà exister (Base.metadata.create_all).
+    Renvoie la liste des versions appliquées.
+    """
+    applied = get_applied_versions(bind)
+    newly_applied = []
+    for version, name, migration in MIGRATIONS:
+        if version in applied:
+            continue
+
+        print(f"Application de la migration {version} ({name})...")
+        migration(bind)
+        with bind.begin() as conn:
+            conn.execute(schema_migrations.insert().values(
+                version=version, name=name, applied_at=datetime.utcnow()
+            ))
+        newly_applied.append(version)
+
+    return newly_applied
+
+if __name__ == "__main__":
+    import models
+
+    models.Base.metadata.create_all(bind=engine)
+    versions = run_migrations()
+    if versions:
+        print(f"Migrations appliquées : {', '.join(str(v) for v in versions)}")
+    else:
+        print("La base de données est à jour.")
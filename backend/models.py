@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Table, Float
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Table, Float
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -8,7 +8,8 @@ tournament_team = Table(
     "tournament_team",
     Base.metadata,
     Column("tournament_id", Integer, ForeignKey("tournaments.id"), primary_key=True),
-    Column("team_id", Integer, ForeignKey("teams.id"), primary_key=True)
+    Column("team_id", Integer, ForeignKey("teams.id"), primary_key=True),
+    Index("ix_tournament_team_team_id", "team_id")
 )
 
 class User(Base):
@@ -25,6 +26,11 @@ class User(Base):
 
 class Team(Base):
     __tablename__ = "teams"
+    __table_args__ = (
+        # Classement : parcouru à l'envers pour les meilleurs scores
+        Index("ix_teams_ranking", "wins", "tournaments_won", "id"),
+        Index("ix_teams_rating", "rating", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -32,6 +38,7 @@ class Team(Base):
     wins = Column(Integer, default=0)
     losses = Column(Integer, default=0)
     tournaments_won = Column(Integer, default=0)
+    rating = Column(Float, default=1500.0)  # Classement Elo (voir ratings.py)
 
     # Relations
     owner = relationship("User", back_populates="teams")
@@ -40,12 +47,18 @@ class Team(Base):
 
 class Player(Base):
     __tablename__ = "players"
+    __table_args__ = (
+        Index("ix_players_team_id_user_id", "team_id", "user_id"),
+        Index("ix_players_ranking", "wins", "id"),
+        Index("ix_players_rating", "rating", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     is_starter = Column(Boolean, default=False)
     team_id = Column(Integer, ForeignKey("teams.id"))
     wins = Column(Integer, default=0)
+    rating = Column(Float, default=1500.0)  # Classement Elo (voir ratings.py)
     status = Column(String, default="active")  # 'active', 'pending', 'declined'
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
 
@@ -62,6 +75,7 @@ class Tournament(Base):
     status = Column(String, default="open")  # 'open', 'upcoming', 'in_progress', 'closed'
     max_teams = Column(Integer)
     owner_id = Column(Integer, ForeignKey("users.id"))
+    version = Column(Integer, default=0)  # Incrémentée à chaque modification (ETag)
 
     # Relations
     teams = relationship("Team", secondary=tournament_team, back_populates="tournaments")
@@ -70,23 +84,36 @@ class Tournament(Base):
 
 class Match(Base):
     __tablename__ = "matches"
+    __table_args__ = (
+        Index("ix_matches_tournament_round_match", "tournament_id", "round", "match_number"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     tournament_id = Column(Integer, ForeignKey("tournaments.id"))
-    team1_id = Column(Integer, ForeignKey("teams.id"))
-    team2_id = Column(Integer, ForeignKey("teams.id"))
+    team1_id = Column(Integer, ForeignKey("teams.id"), index=True)
+    team2_id = Column(Integer, ForeignKey("teams.id"), index=True)
     team1_score = Column(Integer, nullable=True)
     team2_score = Column(Integer, nullable=True)
     round = Column(Integer)
     match_number = Column(Integer)
+    next_match_id = Column(String, ForeignKey("matches.id"), nullable=True, index=True)
+    next_match_slot = Column(String, nullable=True)  # 'team1', 'team2'
+    rating_delta = Column(Float, nullable=True)  # Points Elo gagnés par team1 (voir ratings.py)
 
     # Relations
     tournament = relationship("Tournament", back_populates="matches")
     team1 = relationship("Team", foreign_keys=[team1_id])
     team2 = relationship("Team", foreign_keys=[team2_id])
+    next_match = relationship("Match", remote_side=[id], foreign_keys=[next_match_id])
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Notifications (non lues) d'un utilisateur, de la plus récente à la plus ancienne
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+        # Notifications lues les plus anciennes, pour la purge (retention.py)
+        Index("ix_notifications_read_created", "is_read", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -97,4 +124,17 @@ class Notification(Base):
     data = Column(String)  # JSON data for additional information
 
     # Relations
-    user = relationship("User", backref="notifications") 
\ No newline at end of file
+    user = relationship("User", backref="notifications")
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    # Empreinte SHA-256 du jeton : le jeton lui-même n'est jamais enregistré
+    token_hash = Column(String, unique=True, index=True)
+    created_at = Column(String)
+    expires_at = Column(String)
+    revoked = Column(Boolean, default=False)
+    # Date de l'échange contre un nouveau jeton (None si révoqué autrement : déconnexion...)
+    rotated_at = Column(String, nullable=True)
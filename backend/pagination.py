@@ -0,0 +1,67 @@
+import base64
+import json
+from typing import Optional, Tuple
+
+from sqlalchemy import tuple_
+
+# Pagination par curseur (keyset) des listes de l'API.
+# Chaque page reprend après la dernière clé de la page précédente
+# ("WHERE id > :dernier_id ORDER BY id"), ce qui garde un coût constant
+# quelle que soit la profondeur, contrairement à OFFSET.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(*key) -> str:
+    """
+    Curseur opaque transmis au client : la dernière clé lue, encodée en base64.
+    """
+    payload = json.dumps({"k": list(key)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str], size: int = 1) -> Optional[Tuple]:
+    """
+    Renvoie la clé (de size valeurs) contenue dans un curseur, ou None pour la première page.
+    Lève ValueError si le curseur est invalide.
+    """
+    if not cursor:
+        return None
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(cursor + padding))["k"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(value, (int, float, str)) for value in key):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+def paginate(query, key_columns, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, descending: bool = False):
+    """
+    Applique la pagination par curseur à une requête SQLAlchemy, triée sur key_columns :
+    une colonne unique et indexée (en pratique la clé primaire), ou un tuple de
+    colonnes dont la combinaison est unique. Les valeurs de la clé sont relues sur
+    les résultats par le nom des colonnes.
+    Renvoie (éléments, curseur suivant), le curseur valant None sur la dernière page.
+    """
+    if not isinstance(key_columns, (tuple, list)):
+        key_columns = (key_columns,)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    last_key = decode_cursor(cursor, len(key_columns))
+    if last_key is not None:
+        if len(key_columns) == 1:
+            key, value = key_columns[0], last_key[0]
+            query = query.filter(key < value if descending else key > value)
+        else:
+            key = tuple_(*key_columns)
+            query = query.filter(key < tuple_(*last_key) if descending else key > tuple_(*last_key))
+
+    order_by = [column.desc() if descending else column for column in key_columns]
+    # Une ligne de plus que demandé indique s'il reste une page à lire
+    items = query.order_by(*order_by).limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(*(getattr(items[-1], column.key) for column in key_columns))
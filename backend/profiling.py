@@ -0,0 +1,242 @@
+import asyncio
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from starlette.responses import PlainTextResponse
+
+import auth
+import metrics
+from database import SessionLocal
+
+# Profilage à la demande d'une requête de l'API, réservé aux administrateurs :
+# avec le paramètre "profile=1" ou l'en-tête "X-Profile: 1", la réponse est
+# remplacée par un rapport texte de cProfile (arbre des appels avec le temps
+# cumulé de chaque fonction, puis les fonctions les plus coûteuses). Le flag est
+# ignoré pour les autres utilisateurs.
+#
+# Un profileur cProfile ne suit qu'un thread : celui de la boucle d'événements
+# est complété par un profileur par appel d'une route synchrone, que FastAPI
+# exécute dans son pool de threads (ProfiledRoute). Les dépendances exécutées
+# dans ce pool et le pool bcrypt n'y apparaissent que comme une attente de la
+# boucle ; le rapport donne donc aussi le nombre de requêtes SQL et leur durée.
+# Les autres requêtes traitées pendant ce temps par la boucle sont aussi mesurées.
+
+# Part minimale de la durée de la requête pour qu'un appel soit affiché dans l'arbre
+PROFILE_TREE_MIN_FRACTION = 0.01
+# Profondeur maximale de l'arbre des appels
+PROFILE_TREE_MAX_DEPTH = 40
+# Nombre de fonctions listées par temps propre
+PROFILE_TOP_FUNCTIONS = 30
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _header(scope, name: bytes):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+def _profiling_requested(scope) -> bool:
+    # Un flux SSE ne se termine pas : il n'est jamais profilé
+    if "text/event-stream" in (_header(scope, b"accept") or ""):
+        return False
+    flag = _header(scope, b"x-profile")
+    if flag is None:
+        flag = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [None])[0]
+    return flag in ("1", "true")
+
+def _is_admin_token(token: str) -> bool:
+    db = SessionLocal()
+    try:
+        return bool(auth.get_user_from_token(token, db).is_admin)
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+async def _is_admin(scope) -> bool:
+    authorization = _header(scope, b"authorization") or ""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    return await run_in_threadpool(_is_admin_token, token)
+
+# Profileurs des routes synchrones de la requête profilée : (fonction de route, profileur)
+_thread_profiles = ContextVar("thread_profiles", default=None)
+
+def _call_profiled(endpoint, **values):
+    # Exécuté dans un thread du pool, avec le contexte de la requête
+    profiles = _thread_profiles.get()
+    if profiles is None:
+        return endpoint(**values)
+    profiler = cProfile.Profile()
+    profiles.append((endpoint, profiler))
+    return profiler.runcall(endpoint, **values)
+
+class ProfiledRoute(APIRoute):
+    """
+    Route FastAPI dont la fonction, si elle est synchrone, est profilée dans le
+    thread du pool qui l'exécute lorsque la requête est profilée.
+    """
+
+    def get_route_handler(self):
+        endpoint = self.dependant.call
+        if not asyncio.iscoroutinefunction(endpoint):
+            self.dependant.call = functools.wraps(endpoint)(functools.partial(_call_profiled, endpoint))
+        return super().get_route_handler()
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    # Fichiers des bibliothèques : chemin à partir du paquet ("sqlalchemy/orm/query.py")
+    _, site_packages, package_path = filename.partition(f"site-packages{os.sep}")
+    return f"{package_path if site_packages else os.path.basename(filename)}:{line} {name}"
+
+def _component(func) -> str:
+    """
+    Composant auquel appartient une fonction : paquet installé (sqlalchemy, pydantic...),
+    module de l'application (crud.py...) ou bibliothèque standard.
+    """
+    filename, _, name = func
+    if filename == "~":
+        # Fonction native : "<method 'poll' of 'select.epoll' objects>", "<built-in method builtins.len>"
+        match = re.search(r"of '(\w+)\.", name) or re.search(r"method (\w+)\.", name)
+        module = match.group(1) if match else "builtins"
+        if module == "select":
+            return "attente de la boucle (E/S, routes synchrones, bcrypt)"
+        return module
+    _, site_packages, package_path = filename.partition(f"site-packages{os.sep}")
+    if site_packages:
+        return package_path.split(os.sep)[0]
+    if os.path.dirname(os.path.abspath(filename)) == BACKEND_DIR:
+        return os.path.basename(filename)
+    return "bibliothèque standard"
+
+def _components(stats: pstats.Stats):
+    totals = defaultdict(float)
+    for func, (_, _, own_time, _, _) in stats.stats.items():
+        totals[_component(func)] += own_time
+    total = sum(totals.values()) or 1
+    return [
+        f"{own_time * 1000:10.1f} ms  {own_time / total:6.1%}  {component}"
+        for component, own_time in sorted(totals.items(), key=lambda item: -item[1])
+        if own_time * 1000 >= 0.05
+    ]
+
+def _is_event_loop(func) -> bool:
+    # Fonctions de la boucle d'événements : elles exécutent aussi les autres tâches
+    filename, _, name = func
+    return f"{os.sep}asyncio{os.sep}" in filename or filename.endswith("selectors.py") or "_contextvars.Context" in name
+
+def _call_tree(stats: pstats.Stats, roots, duration: float):
+    """
+    Arbre des appels sous chacune des racines, reconstruit à partir des arcs appelant -> appelé de
+    cProfile. Pour une coroutine, cProfile ne rattache pas chaque reprise à son
+    appelant : chaque fonction est donc affichée avec son temps cumulé total, une
+    seule fois, sous le premier appelant parcouru (les plus coûteux d'abord).
+    """
+    children = defaultdict(set)
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller in callers:
+            children[caller].add(func)
+
+    def cumulative(func):
+        return stats.stats[func][3]
+
+    lines = []
+    seen = set()
+
+    def walk(func, depth):
+        seen.add(func)
+        lines.append(f"{cumulative(func) * 1000:10.1f} ms  {'  ' * depth}{_label(func)}")
+        if depth >= PROFILE_TREE_MAX_DEPTH:
+            return
+        for child in sorted(children[func], key=cumulative, reverse=True):
+            if child in seen or _is_event_loop(child):
+                continue
+            if cumulative(child) >= duration * PROFILE_TREE_MIN_FRACTION:
+                walk(child, depth + 1)
+
+    for root in roots:
+        if root in stats.stats and root not in seen:
+            walk(root, 0)
+    return lines
+
+def render_report(scope, status_code: int, duration: float, request_stats, profiler: cProfile.Profile, thread_profiles) -> str:
+    stats = pstats.Stats(profiler)
+    for _, thread_profiler in thread_profiles:
+        stats.add(thread_profiler)
+    lines = [f"{scope['method']} {scope['path']} -> {status_code}", f"Durée : {duration * 1000:.1f} ms"]
+    if request_stats is not None:
+        lines.append(
+            f"Base de données : {request_stats.queries} requête(s) SQL, {request_stats.db_time * 1000:.1f} ms"
+        )
+    lines += ["", "Temps propre par composant", ""]
+    lines += _components(stats)
+    lines += ["", "Arbre des appels (temps cumulé)", ""]
+    # Le profileur est activé dans ProfilingMiddleware.__call__ : les appels de la
+    # requête sont sous ce cadre, le reste est le travail de la boucle d'événements.
+    # Les routes synchrones ont leur propre arbre, dans leur thread.
+    roots = [cProfile.label(ProfilingMiddleware.__call__.__code__)]
+    roots += [cProfile.label(endpoint.__code__) for endpoint, _ in thread_profiles]
+    lines += _call_tree(stats, roots, duration)
+
+    top = io.StringIO()
+    stats.stream = top
+    stats.sort_stats("tottime").print_stats(PROFILE_TOP_FUNCTIONS)
+    lines += ["", f"Fonctions les plus coûteuses (temps propre, {PROFILE_TOP_FUNCTIONS} premières)", top.getvalue()]
+    return "\n".join(lines)
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI : profile les requêtes marquées d'un administrateur, une à la fois.
+    Doit être placé sous MetricsMiddleware pour indiquer les requêtes SQL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # Un seul profileur actif à la fois dans le thread de la boucle
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profiling_requested(scope) or not await _is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async with self._lock:
+            status_code = 500
+
+            async def discard_response(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+
+            profiler = cProfile.Profile()
+            thread_profiles = []
+            token = _thread_profiles.set(thread_profiles)
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, discard_response)
+            finally:
+                profiler.disable()
+                _thread_profiles.reset(token)
+            duration = time.perf_counter() - start
+
+            report = render_report(
+                scope, status_code, duration, metrics.current_request_stats(), profiler, thread_profiles
+            )
+        response = PlainTextResponse(report, headers={"X-Profiled-Status": str(status_code)})
+        await response(scope, receive, send)
@@ -0,0 +1,121 @@
+import math
+import os
+import threading
+import time
+
+# Limitation du débit des routes qui exécutent bcrypt (connexion, inscription) :
+# un seau de jetons par adresse IP et un par nom d'utilisateur et adresse IP. Une
+# requête n'est acceptée que si ses deux seaux ont un jeton, et une requête refusée
+# ne consomme rien. Elle reçoit un 429 avant toute vérification de mot de passe.
+# Comme le cache des réponses, les seaux sont propres au processus.
+
+# Seaux par adresse IP : nombre de requêtes en rafale, puis débit par minute
+# (une capacité à 0 désactive la limite)
+RATE_LIMIT_IP_BURST = int(os.getenv("RATE_LIMIT_IP_BURST", "20"))
+RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "20"))
+# Seaux par nom d'utilisateur et adresse IP, pour les essais répétés sur un même compte.
+# L'adresse fait partie de la clé : les essais d'un tiers ne bloquent pas le titulaire
+# du compte, qui se connecte depuis une autre adresse
+RATE_LIMIT_USERNAME_BURST = int(os.getenv("RATE_LIMIT_USERNAME_BURST", "5"))
+RATE_LIMIT_USERNAME_PER_MINUTE = float(os.getenv("RATE_LIMIT_USERNAME_PER_MINUTE", "5"))
+# Intervalle (secondes) entre deux suppressions des seaux inactifs
+RATE_LIMIT_EVICTION_INTERVAL = float(os.getenv("RATE_LIMIT_EVICTION_INTERVAL", "60"))
+
+class TokenBucketLimiter:
+    """
+    Seaux de jetons en mémoire, un par clé. Chaque requête consomme un jeton ; les
+    jetons se reconstituent au débit rate (par seconde) jusqu'à capacity. Un seau
+    redevenu plein équivaut à un seau absent : il est supprimé au nettoyage suivant.
+    """
+
+    # Verrou commun à tous les limiteurs : acquire_all contrôle plusieurs seaux d'un coup
+    _lock = threading.Lock()
+
+    def __init__(self, capacity: int, rate: float, eviction_interval: float = RATE_LIMIT_EVICTION_INTERVAL):
+        self.capacity = capacity
+        self.rate = rate
+        self.eviction_interval = eviction_interval
+        # clé -> [jetons restants, instant de la dernière mise à jour]
+        self._buckets = {}
+        self._next_eviction = time.monotonic() + eviction_interval
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def acquire(self, key) -> float:
+        """
+        Consomme un jeton du seau de key. Renvoie 0 si la requête est acceptée,
+        sinon le délai (secondes) avant qu'un jeton soit disponible.
+        """
+        return acquire_all([(self, key)])
+
+    def _bucket(self, key, now: float):
+        # Seau de key, avec les jetons reconstitués jusqu'à now (appelé sous _lock)
+        if now >= self._next_eviction:
+            self._evict(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.capacity), now]
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def _retry_after(self, bucket) -> float:
+        if bucket[0] >= 1:
+            return 0.0
+        return (1 - bucket[0]) / self.rate if self.rate > 0 else math.inf
+
+    def _evict(self, now: float):
+        # Temps nécessaire pour qu'un seau vide redevienne plein
+        refill_time = self.capacity / self.rate if self.rate > 0 else math.inf
+        idle = [key for key, (_, updated) in self._buckets.items() if now - updated >= refill_time]
+        for key in idle:
+            del self._buckets[key]
+        self.evictions += len(idle)
+        self._next_eviction = now + self.eviction_interval
+
+    def stats(self):
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "per_minute": self.rate * 60,
+                "buckets": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+            }
+
+def acquire_all(requests) -> float:
+    """
+    Consomme un jeton dans chacun des seaux (limiteur, clé) de requests, seulement
+    s'ils en ont tous un. Renvoie 0 si la requête est acceptée, sinon le plus long
+    délai avant de réessayer ; aucun jeton n'est alors consommé.
+    """
+    now = time.monotonic()
+    with TokenBucketLimiter._lock:
+        buckets = [(limiter, limiter._bucket(key, now)) for limiter, key in requests if limiter.capacity > 0]
+        waits = [(limiter, limiter._retry_after(bucket)) for limiter, bucket in buckets]
+        retry_after = max((wait for _, wait in waits), default=0.0)
+        if retry_after:
+            for limiter, wait in waits:
+                if wait:
+                    limiter.rejected += 1
+            return retry_after
+        for limiter, bucket in buckets:
+            bucket[0] -= 1
+            limiter.allowed += 1
+        return 0.0
+
+by_ip = TokenBucketLimiter(RATE_LIMIT_IP_BURST, RATE_LIMIT_IP_PER_MINUTE / 60)
+by_username = TokenBucketLimiter(RATE_LIMIT_USERNAME_BURST, RATE_LIMIT_USERNAME_PER_MINUTE / 60)
+
+def check_auth_rate(route: str, ip: str, username: str) -> float:
+    """
+    Contrôle une requête de connexion ou d'inscription (route : "login" ou "register").
+    Renvoie 0 si elle est acceptée, sinon le délai avant de réessayer.
+    """
+    return acquire_all([(by_ip, (route, ip)), (by_username, (route, username.lower(), ip))])
+
+def stats():
+    return {"ip": by_ip.stats(), "username": by_username.stats()}
@@ -0,0 +1,191 @@
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+import cache
+import models
+
+# Classement Elo des équipes et des joueurs.
+# Les matchs ne mémorisent pas les joueurs alignés : un joueur actif reçoit donc,
+# pour chaque match de son équipe, la même variation de points que l'équipe.
+# Chaque match joué garde la variation appliquée (Match.rating_delta) pour qu'une
+# correction de score puisse l'annuler avant de reclasser le match.
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+# Écart de points pour lequel l'équipe la mieux classée a 10 chances sur 11 de gagner
+RATING_SCALE = 400.0
+
+def expected_score(rating, opponent_rating):
+    """
+    Probabilité de victoire attendue (fonctionne aussi sur des tableaux NumPy).
+    """
+    return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / RATING_SCALE))
+
+def match_result(team1_score: int, team2_score: int) -> float:
+    """
+    Résultat du match pour team1 : 1 victoire, 0 défaite, 0.5 égalité.
+    """
+    if team1_score > team2_score:
+        return 1.0
+    if team1_score < team2_score:
+        return 0.0
+    return 0.5
+
+def rating_delta(team1_rating: float, team2_rating: float, result: float) -> float:
+    """
+    Points gagnés par team1 (et perdus par team2).
+    """
+    return K_FACTOR * (result - expected_score(team1_rating, team2_rating))
+
+def _active_players(team: models.Team):
+    return [player for player in team.players if player.status in (None, "active")]
+
+def update_match_ratings(db: Session, db_match: models.Match):
+    """
+    Met à jour les classements des deux équipes et de leurs joueurs actifs après
+    un match joué, sans valider la transaction, et mémorise la variation dans le
+    match. Les forfaits ne comptent pas.
+    """
+    if db_match.team1_id is None or db_match.team2_id is None:
+        return
+    if db_match.team1_score is None or db_match.team2_score is None:
+        return
+
+    team1, team2 = db_match.team1, db_match.team2
+    delta = rating_delta(
+        team1.rating if team1.rating is not None else INITIAL_RATING,
+        team2.rating if team2.rating is not None else INITIAL_RATING,
+        match_result(db_match.team1_score, db_match.team2_score),
+    )
+    _apply_delta(team1, team2, delta)
+    db_match.rating_delta = delta
+
+def revert_match_ratings(db: Session, db_match: models.Match):
+    """
+    Annule la variation de classement d'un match avant une correction de son score
+    ou sa remise à jouer, sans valider la transaction. Les variations s'annulent
+    dans n'importe quel ordre : seul le reclassement dépend des classements courants.
+    """
+    if db_match.rating_delta is None:
+        return
+    if db_match.team1 is not None and db_match.team2 is not None:
+        _apply_delta(db_match.team1, db_match.team2, -db_match.rating_delta)
+    db_match.rating_delta = None
+
+def _apply_delta(team1: models.Team, team2: models.Team, delta: float):
+    for team, team_delta in ((team1, delta), (team2, -delta)):
+        team.rating = (team.rating if team.rating is not None else INITIAL_RATING) + team_delta
+        for player in _active_players(team):
+            player.rating = (player.rating if player.rating is not None else INITIAL_RATING) + team_delta
+
+def _match_levels(team1_index: np.ndarray, team2_index: np.ndarray, team_count: int) -> np.ndarray:
+    """
+    Numéro de lot de chaque match (dans l'ordre chronologique) : un match est placé
+    juste après le dernier lot où l'une de ses deux équipes a joué. Dans un même lot,
+    une équipe ne joue qu'une fois, les matchs d'un lot sont donc indépendants.
+    """
+    last_level = [0] * team_count
+    levels = np.empty(len(team1_index), dtype=np.int64)
+    for i, (team1, team2) in enumerate(zip(team1_index.tolist(), team2_index.tolist())):
+        level = max(last_level[team1], last_level[team2]) + 1
+        last_level[team1] = last_level[team2] = level
+        levels[i] = level
+    return levels
+
+def compute_team_ratings(team_ids: np.ndarray, team1_ids: np.ndarray, team2_ids: np.ndarray, results: np.ndarray):
+    """
+    Rejoue des matchs (triés chronologiquement) et renvoie le classement final
+    de chaque équipe de team_ids et la variation de chaque match (points gagnés
+    par team1). Les matchs indépendants sont traités par lots vectorisés ; le
+    résultat est identique à un traitement match par match.
+    """
+    ratings = np.full(len(team_ids), INITIAL_RATING)
+    deltas = np.zeros(len(results))
+    if len(results) == 0:
+        return ratings, deltas
+
+    order = np.argsort(team_ids)
+    team1_index = order[np.searchsorted(team_ids, team1_ids, sorter=order)]
+    team2_index = order[np.searchsorted(team_ids, team2_ids, sorter=order)]
+
+    levels = _match_levels(team1_index, team2_index, len(team_ids))
+    by_level = np.argsort(levels, kind="stable")
+    boundaries = np.flatnonzero(np.diff(levels[by_level])) + 1
+    for batch in np.split(by_level, boundaries):
+        team1, team2 = team1_index[batch], team2_index[batch]
+        delta = K_FACTOR * (results[batch] - expected_score(ratings[team1], ratings[team2]))
+        ratings[team1] += delta
+        ratings[team2] -= delta
+        deltas[batch] = delta
+    return ratings, deltas
+
+def recompute_ratings(db: Session):
+    """
+    Recalcule tous les classements en rejouant l'historique des matchs joués,
+    du plus ancien au plus récent, puis les enregistre en une mise à jour groupée
+    avec la variation de chaque match rejoué.
+    Renvoie (nombre d'équipes, nombre de joueurs, nombre de matchs rejoués).
+    """
+    team_ids = np.fromiter(db.execute(select(models.Team.id)).scalars(), dtype=np.int64)
+
+    matches = db.execute(
+        select(
+            models.Match.id, models.Match.team1_id, models.Match.team2_id,
+            models.Match.team1_score, models.Match.team2_score,
+        )
+        .join(models.Tournament, models.Tournament.id == models.Match.tournament_id)
+        .where(
+            models.Match.team1_id.is_not(None),
+            models.Match.team2_id.is_not(None),
+            models.Match.team1_score.is_not(None),
+            models.Match.team2_score.is_not(None),
+        )
+        .order_by(models.Tournament.date, models.Match.tournament_id, models.Match.round, models.Match.match_number)
+    ).all()
+    if matches:
+        match_ids, team1_ids, team2_ids, team1_scores, team2_scores = (np.array(column) for column in zip(*matches))
+        results = np.where(team1_scores > team2_scores, 1.0, np.where(team1_scores < team2_scores, 0.0, 0.5))
+        # Ignorer les matchs d'équipes supprimées depuis
+        known = np.isin(team1_ids, team_ids) & np.isin(team2_ids, team_ids)
+        match_ids, team1_ids, team2_ids, results = match_ids[known], team1_ids[known], team2_ids[known], results[known]
+    else:
+        match_ids = np.empty(0, dtype=object)
+        team1_ids = team2_ids = np.empty(0, dtype=np.int64)
+        results = np.empty(0)
+
+    ratings, deltas = compute_team_ratings(team_ids, team1_ids, team2_ids, results)
+    team_ratings = dict(zip(team_ids.tolist(), ratings.tolist()))
+
+    # Les joueurs actifs prennent le classement de leur équipe, les autres repartent du classement initial
+    players = db.execute(select(models.Player.id, models.Player.team_id, models.Player.status)).all()
+    player_rows = [
+        {
+            "id": player_id,
+            "rating": team_ratings.get(team_id, INITIAL_RATING) if status in (None, "active") else INITIAL_RATING,
+        }
+        for player_id, team_id, status in players
+    ]
+
+    if team_ratings:
+        db.execute(update(models.Team), [{"id": team_id, "rating": rating} for team_id, rating in team_ratings.items()])
+    if player_rows:
+        db.execute(update(models.Player), player_rows)
+    if len(match_ids):
+        db.execute(
+            update(models.Match),
+            [{"id": match_id, "rating_delta": delta} for match_id, delta in zip(match_ids.tolist(), deltas.tolist())],
+        )
+    db.commit()
+    cache.invalidate_scoreboard()
+    return len(team_ratings), len(player_rows), len(results)
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        teams, players, matches = recompute_ratings(db)
+        print(f"{matches} match(s) rejoué(s) : classement de {teams} équipe(s) et {players} joueur(s) recalculé(s).")
+    finally:
+        db.close()
@@ -0,0 +1,78 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+import models
+
+# Purge des notifications lues trop anciennes : la table ne fait que grandir, alors
+# qu'une notification lue ne sert plus qu'à l'historique. Les notifications non lues
+# sont toujours gardées. Les dates sont des chaînes ISO 8601 (datetime.isoformat),
+# donc comparables dans l'ordre alphabétique : l'index ix_notifications_read_created
+# permet de lire directement les plus anciennes.
+
+logger = logging.getLogger(__name__)
+
+# Âge (jours) au-delà duquel une notification lue est supprimée (0 désactive la purge automatique)
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+# Nombre de notifications supprimées par transaction : chaque lot garde le verrou
+# d'écriture peu de temps, les scores saisis entre deux lots ne sont pas bloqués
+NOTIFICATION_RETENTION_BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "500"))
+# Intervalle (secondes) entre deux purges automatiques (0 désactive la tâche de fond)
+NOTIFICATION_RETENTION_INTERVAL = float(os.getenv("NOTIFICATION_RETENTION_INTERVAL", "3600"))
+
+def purge_read_notifications(
+    db: Session,
+    max_age_days: int = NOTIFICATION_RETENTION_DAYS,
+    batch_size: int = NOTIFICATION_RETENTION_BATCH_SIZE,
+):
+    """
+    Supprime les notifications lues créées il y a plus de max_age_days jours, par
+    lots de batch_size avec un commit par lot.
+    Renvoie un rapport : date limite, lignes supprimées, lots et durée en secondes.
+    """
+    started = time.perf_counter()
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+    report = {"cutoff": cutoff, "deleted": 0, "batches": 0, "seconds": 0.0}
+    Notification = models.Notification
+    while True:
+        ids = db.execute(
+            select(Notification.id)
+            .where(Notification.is_read.is_(True), Notification.created_at < cutoff)
+            .order_by(Notification.created_at)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        db.execute(delete(Notification).where(Notification.id.in_(ids)))
+        db.commit()
+        report["deleted"] += len(ids)
+        report["batches"] += 1
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+def run_purge():
+    """
+    Purge avec une session dédiée (tâche de fond et ligne de commande).
+    """
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        report = purge_read_notifications(db)
+    finally:
+        db.close()
+    logger.info(
+        "Purge des notifications lues avant le %s : %d supprimée(s) en %d lot(s), %s s.",
+        report["cutoff"], report["deleted"], report["batches"], report["seconds"],
+    )
+    return report
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    run_purge()
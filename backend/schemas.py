@@ -33,11 +33,17 @@ class Team(TeamBase):
     wins: int = 0
     losses: int = 0
     tournaments_won: int = 0
+    rating: float = 1500.0
     players: List[Player] = []
 
     class Config:
         orm_mode = True
 
+# Page de la liste des équipes (next_cursor vaut None sur la dernière page)
+class TeamPage(BaseModel):
+    items: List[Team]
+    next_cursor: Optional[str] = None
+
 # Schémas pour User
 class UserBase(BaseModel):
     username: str
@@ -59,6 +65,10 @@ class User(UserBase):
     class Config:
         orm_mode = True
 
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[str] = None
+
 # Schémas pour Tournament
 class TournamentTeam(BaseModel):
     id: int
@@ -82,10 +92,16 @@ class Match(MatchBase):
     id: str
     team1_score: Optional[int] = None
     team2_score: Optional[int] = None
+    next_match_id: Optional[str] = None
+    next_match_slot: Optional[str] = None
 
     class Config:
         orm_mode = True
 
+class MatchScoreUpdate(Match):
+    # Tous les matchs modifiés par la saisie du score (propagation comprise)
+    updated_matches: List[Match] = []
+
 class TournamentBase(BaseModel):
     name: str
     date: str
@@ -98,12 +114,32 @@ class Tournament(TournamentBase):
     id: int
     status: str
     owner_id: int
+    version: int = 0
     teams: List[TournamentTeam] = []
     matches: List[Match] = []
 
     class Config:
         orm_mode = True
 
+# Résumé d'un tournoi pour les listes, sans les équipes ni les matchs
+class TournamentSummary(BaseModel):
+    id: int
+    name: str
+    date: str
+    status: str
+    max_teams: int
+    owner_id: int
+    team_count: int = 0
+    winner_id: Optional[int] = None
+    winner_name: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class TournamentPage(BaseModel):
+    items: List[TournamentSummary]
+    next_cursor: Optional[str] = None
+
 # Schémas pour Scoreboard
 class ScoreboardTeam(BaseModel):
     id: int
@@ -111,16 +147,38 @@ class ScoreboardTeam(BaseModel):
     wins: int
     losses: int = 0
     tournaments_won: int = 0
+    rating: float = 1500.0
+    rank: Optional[int] = None
+
+class ScoreboardTeamPage(BaseModel):
+    items: List[ScoreboardTeam]
+    next_cursor: Optional[str] = None
 
 class ScoreboardPlayer(BaseModel):
     id: int
     name: str
     wins: int
+    rating: float = 1500.0
+    rank: Optional[int] = None
+
+class ScoreboardPlayerPage(BaseModel):
+    items: List[ScoreboardPlayer]
+    next_cursor: Optional[str] = None
+
+# Statistiques des matchs d'un utilisateur (page de profil)
+class UserMatchStats(BaseModel):
+    matches_played: int
+    victories: int
+    points_scored: int
 
 # Schéma pour Token
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     username: Optional[str] = None
@@ -142,4 +200,13 @@ class Notification(NotificationBase):
     created_at: str
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True
+
+# Page de notifications, de la plus récente à la plus ancienne
+class NotificationPage(BaseModel):
+    items: List[Notification]
+    next_cursor: Optional[str] = None
+
+# Notifications à marquer comme lues (toutes celles de l'utilisateur si ids est absent)
+class NotificationsRead(BaseModel):
+    ids: Optional[List[int]] = None
@@ -0,0 +1,95 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import event
+
+# Journal des requêtes SQL lentes : chaque requête plus longue que le seuil est
+# gardée dans un tampon circulaire (GET /api/admin/slow-queries), avec, pour
+# SQLite, le résultat de EXPLAIN QUERY PLAN. Un "SCAN" sur une grande table y
+# signale un index manquant. Les valeurs des paramètres (e-mails, hachés de mots
+# de passe, jetons...) ne sont ni journalisées ni gardées : seule la requête avec
+# ses marqueurs "?" l'est.
+
+logger = logging.getLogger(__name__)
+
+# Seuil en millisecondes au-delà duquel une requête est journalisée (0 désactive le journal)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+# Nombre de requêtes lentes gardées (les plus anciennes sont supprimées)
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, size: int = SLOW_QUERY_LOG_SIZE):
+        self.threshold_ms = threshold_ms
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def add(self, entry: dict):
+        with self._lock:
+            self._entries.append(entry)
+            self.total += 1
+
+    def entries(self):
+        """
+        Requêtes lentes gardées, de la plus récente à la plus ancienne.
+        """
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold_ms,
+                "size": self._entries.maxlen,
+                "total": self.total,
+                "entries": list(reversed(self._entries)),
+            }
+
+log = SlowQueryLog()
+
+def _explain(conn, statement: str, parameters):
+    """
+    Plan d'exécution SQLite de la requête (None pour les autres bases ou si la
+    requête ne peut pas être expliquée). Exécuté sur un curseur DBAPI séparé, donc
+    sans déclencher les événements du moteur.
+    """
+    if conn.dialect.name != "sqlite":
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - context._slow_query_start) * 1000
+    if duration_ms < log.threshold_ms:
+        return
+
+    # Pour un executemany, le plan de la première ligne suffit. Les paramètres ne
+    # servent qu'à EXPLAIN et ne sont pas gardés.
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    logger.warning("Requête lente (%.1f ms) : %s", duration_ms, " ".join(statement.split()))
+    log.add({
+        "at": datetime.now().isoformat(),
+        "duration_ms": round(duration_ms, 3),
+        "statement": statement,
+        "executemany": executemany,
+        "plan": _explain(conn, statement, parameters),
+    })
+
+def instrument_engine(sync_engine):
+    """
+    Journalise les requêtes lentes d'un moteur.
+    """
+    if log.threshold_ms <= 0:
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
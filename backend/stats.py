@@ -0,0 +1,144 @@
+from sqlalchemy import and_, case, func, select, union_all, update
+from sqlalchemy.orm import Session
+
+import cache
+import models
+
+# Reconstruction des compteurs de victoires à partir de l'historique des matchs.
+# Les compteurs sont tenus à jour à chaque score (crud.update_match_score) ; cette
+# reconstruction corrige les écarts éventuels. Règles de comptage :
+# - victoires / défaites d'une équipe : matchs joués entre deux équipes, avec un
+#   vainqueur (les forfaits et les égalités ne comptent pas) ;
+# - tournois gagnés : finales (match sans match suivant) des tournois clôturés ;
+# - victoires d'un joueur actif : celles de son équipe (les matchs ne mémorisent
+#   pas les joueurs alignés), 0 pour les autres joueurs. Un joueur qui rejoint
+#   l'équipe reprend donc ses victoires (crud._set_player_wins).
+
+# Nombre d'équipes traitées par lot : chaque lot est agrégé en une requête et
+# validé séparément pour ne pas garder le verrou d'écriture longtemps
+REBUILD_CHUNK_SIZE = 1000
+
+def _played():
+    Match = models.Match
+    return and_(
+        Match.team1_id.is_not(None),
+        Match.team2_id.is_not(None),
+        Match.team1_score.is_not(None),
+        Match.team2_score.is_not(None),
+        Match.team1_score != Match.team2_score,
+    )
+
+def _team_results(first_id: int, last_id: int):
+    """
+    Une ligne (team_id, victoires, défaites) par équipe de l'intervalle ayant joué,
+    en lisant les matchs par les index ix_matches_team1_id et ix_matches_team2_id.
+    """
+    Match = models.Match
+    played = _played()
+    sides = union_all(
+        select(
+            Match.team1_id.label("team_id"),
+            case((Match.team1_score > Match.team2_score, 1), else_=0).label("won"),
+            case((Match.team1_score < Match.team2_score, 1), else_=0).label("lost"),
+        ).where(played, Match.team1_id.between(first_id, last_id)),
+        select(
+            Match.team2_id.label("team_id"),
+            case((Match.team2_score > Match.team1_score, 1), else_=0).label("won"),
+            case((Match.team2_score < Match.team1_score, 1), else_=0).label("lost"),
+        ).where(played, Match.team2_id.between(first_id, last_id)),
+    ).subquery()
+    return (
+        select(sides.c.team_id, func.sum(sides.c.won), func.sum(sides.c.lost))
+        .group_by(sides.c.team_id)
+    )
+
+def _tournaments_won(first_id: int, last_id: int):
+    """
+    Une ligne (team_id, tournois gagnés) par équipe de l'intervalle.
+    """
+    Match = models.Match
+    winner_id = case(
+        (Match.team1_score > Match.team2_score, Match.team1_id),
+        (Match.team2_score > Match.team1_score, Match.team2_id),
+    )
+    finals = (
+        select(winner_id.label("team_id"))
+        .join(models.Tournament, models.Tournament.id == Match.tournament_id)
+        .where(
+            models.Tournament.status == "closed",
+            Match.next_match_id.is_(None),
+            Match.team1_score.is_not(None),
+            Match.team2_score.is_not(None),
+        )
+        .subquery()
+    )
+    return (
+        select(finals.c.team_id, func.count())
+        .where(finals.c.team_id.between(first_id, last_id))
+        .group_by(finals.c.team_id)
+    )
+
+def rebuild_stats(db: Session, chunk_size: int = REBUILD_CHUNK_SIZE):
+    """
+    Recalcule les victoires, défaites et tournois gagnés de toutes les équipes et
+    les victoires de tous les joueurs, par lots d'équipes consécutives : une requête
+    d'agrégation et une mise à jour groupée par lot, avec un commit par lot.
+    Renvoie un rapport avec le nombre de lignes traitées et corrigées.
+    """
+    matches = db.execute(select(func.count()).select_from(models.Match).where(_played())).scalar_one()
+    report = {"teams": 0, "players": 0, "matches": matches, "teams_changed": 0, "players_changed": 0}
+    last_id = None
+    while True:
+        query = select(models.Team.id, models.Team.wins, models.Team.losses, models.Team.tournaments_won)
+        if last_id is not None:
+            query = query.where(models.Team.id > last_id)
+        teams = db.execute(query.order_by(models.Team.id).limit(chunk_size)).all()
+        if not teams:
+            return report
+
+        first_id, last_id = teams[0].id, teams[-1].id
+        results = {team_id: (wins, losses) for team_id, wins, losses in db.execute(_team_results(first_id, last_id))}
+        titles = dict(db.execute(_tournaments_won(first_id, last_id)).all())
+
+        team_rows = []
+        for team in teams:
+            wins, losses = results.get(team.id, (0, 0))
+            tournaments_won = titles.get(team.id, 0)
+            if (team.wins, team.losses, team.tournaments_won) != (wins, losses, tournaments_won):
+                team_rows.append({"id": team.id, "wins": wins, "losses": losses, "tournaments_won": tournaments_won})
+
+        team_wins = {team.id: results.get(team.id, (0, 0))[0] for team in teams}
+        players = db.execute(
+            select(models.Player.id, models.Player.team_id, models.Player.status, models.Player.wins)
+            .where(models.Player.team_id.between(first_id, last_id))
+        ).all()
+        player_rows = []
+        for player_id, team_id, status, current_wins in players:
+            wins = team_wins.get(team_id, 0) if status in (None, "active") else 0
+            if current_wins != wins:
+                player_rows.append({"id": player_id, "wins": wins})
+
+        if team_rows:
+            db.execute(update(models.Team), team_rows)
+        if player_rows:
+            db.execute(update(models.Player), player_rows)
+        db.commit()
+        cache.invalidate_scoreboard()
+
+        report["teams"] += len(teams)
+        report["players"] += len(players)
+        report["teams_changed"] += len(team_rows)
+        report["players_changed"] += len(player_rows)
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        report = rebuild_stats(db)
+        print(
+            f"{report['matches']} match(s) compté(s) : {report['teams_changed']}/{report['teams']} équipe(s) "
+            f"et {report['players_changed']}/{report['players']} joueur(s) corrigé(s)."
+        )
+    finally:
+        db.close()
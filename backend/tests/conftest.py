@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Base SQLite temporaire : database.py lit DATABASE_URL à l'import
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='babyfoot-tests-')}/test.db"
+
+import crud
+import migrations
+import models
+import schemas
+from database import SessionLocal, engine
+
+@pytest.fixture
+def db():
+    """
+    Session sur une base vide, créée comme au démarrage de l'application.
+    """
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrations_metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    migrations.run_migrations(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def start_tournament(db):
+    """
+    Démarre un tournoi de teams_count équipes (tableau de max_teams places) et
+    renvoie ses matchs par identifiant court ("round1-match1").
+    """
+    def start(teams_count: int, max_teams: int):
+        owner = models.User(username="owner", email="owner@example.com", hashed_password="x")
+        db.add(owner)
+        db.commit()
+        teams = [models.Team(name=f"Équipe {i + 1}", owner_id=owner.id) for i in range(teams_count)]
+        db.add_all(teams)
+        db.commit()
+        tournament = crud.create_tournament(
+            db, schemas.TournamentCreate(name="Tournoi", date="2024-01-01", max_teams=max_teams), owner.id
+        )
+        tournament.teams.extend(teams)
+        db.commit()
+        crud.start_tournament(db, tournament.id)
+        return tournament, teams
+
+    return start
+
+def matches_by_name(db, tournament_id: int):
+    return {match.id.rsplit("-", 1)[0]: match for match in crud.get_tournament_matches(db, tournament_id)}
@@ -0,0 +1,46 @@
+import bracket
+import crud
+from conftest import matches_by_name
+
+def _by_name(matches):
+    return {match["id"].rsplit("-", 1)[0]: match for match in matches}
+
+def _result(match):
+    return match["team1_id"], match["team2_id"], match["team1_score"], match["team2_score"]
+
+def test_uneven_bracket_waits_for_pending_feeders():
+    # 5 équipes dans un tableau de 8 : l'équipe 5 passe le premier tour par forfait
+    matches = _by_name(bracket.build_bracket(1, [1, 2, 3, 4, 5], 8))
+
+    assert _result(matches["round1-match1"]) == (1, 2, None, None)
+    assert _result(matches["round1-match2"]) == (3, 4, None, None)
+    assert _result(matches["round1-match3"]) == (5, None, 1, 0)
+    assert _result(matches["round1-match4"]) == (None, None, 0, 0)
+    # Ses adversaires viennent des matchs non joués : rien n'est validé d'avance
+    assert _result(matches["round2-match1"]) == (None, None, None, None)
+    assert _result(matches["round2-match2"]) == (5, None, 1, 0)
+    assert _result(matches["round3-match1"]) == (None, 5, None, None)
+
+def test_lone_team_advances_through_empty_subtrees():
+    matches = _by_name(bracket.build_bracket(1, [1, 2, 3], 16))
+
+    assert _result(matches["round2-match1"]) == (None, 3, None, None)
+    assert _result(matches["round2-match2"]) == (None, None, 0, 0)
+    assert _result(matches["round3-match1"]) == (None, None, None, None)
+    assert _result(matches["round3-match2"]) == (None, None, 0, 0)
+    assert _result(matches["round4-match1"]) == (None, None, None, None)
+
+def test_uneven_tournament_is_played_to_the_final(db, start_tournament):
+    tournament, teams = start_tournament(5, 8)
+    team_ids = [team.id for team in teams]
+
+    crud.update_match_score(db, matches_by_name(db, tournament.id)["round1-match1"].id, 3, 1)
+    crud.update_match_score(db, matches_by_name(db, tournament.id)["round1-match2"].id, 1, 3)
+    matches = matches_by_name(db, tournament.id)
+    round2 = matches["round2-match1"]
+    assert (round2.team1_id, round2.team2_id, round2.team1_score) == (team_ids[0], team_ids[3], None)
+    assert matches["round3-match1"].team1_id is None
+
+    crud.update_match_score(db, round2.id, 3, 2)
+    final = matches_by_name(db, tournament.id)["round3-match1"]
+    assert (final.team1_id, final.team2_id, final.team1_score, final.team2_score) == (team_ids[0], team_ids[4], None, None)
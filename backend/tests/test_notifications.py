@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+import auth
+import crud
+import models
+import schemas
+from main import app
+
+def _user(db, username: str):
+    user = models.User(username=username, email=f"{username}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+def _headers(user):
+    return {"Authorization": f"Bearer {auth.create_access_token({'sub': user.username})}"}
+
+def test_mark_read_checks_ownership_before_updating(db):
+    owner, other = _user(db, "owner"), _user(db, "other")
+    notification = crud.create_notification(db, schemas.NotificationCreate(
+        user_id=owner.id, type="team_invitation", content="Invitation", created_at="2024-01-01T00:00:00",
+    ))
+    client = TestClient(app)
+
+    response = client.put(f"/api/notifications/{notification.id}/read", headers=_headers(other))
+    assert response.status_code == 403
+    db.refresh(notification)
+    assert not notification.is_read
+
+    response = client.put(f"/api/notifications/{notification.id}/read", headers=_headers(owner))
+    assert response.status_code == 200
+    assert response.json()["is_read"] is True
@@ -0,0 +1,40 @@
+from sqlalchemy import event
+
+import crud
+import models
+import schemas
+from database import engine
+
+def _count_queries(run):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements)
+
+def test_user_page_loads_teams_and_players_in_constant_queries(db):
+    for i in range(10):
+        user = models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        for j in range(2):
+            team = models.Team(name=f"Équipe {i}-{j}", owner_id=user.id)
+            team.players.append(models.Player(name=f"Joueur {i}-{j}"))
+            db.add(team)
+    db.commit()
+    db.expire_all()
+
+    def read_page():
+        users, next_cursor = crud.get_users(db, limit=5)
+        page = schemas.UserPage.model_validate({"items": users, "next_cursor": next_cursor}, from_attributes=True)
+        assert len(page.items) == 5 and all(len(user.teams) == 2 for user in page.items)
+        assert all(len(team.players) == 1 for user in page.items for team in user.teams)
+
+    # Utilisateurs, puis leurs équipes, puis les joueurs de ces équipes
+    assert _count_queries(read_page) == 3
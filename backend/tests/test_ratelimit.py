@@ -0,0 +1,30 @@
+import pytest
+
+import ratelimit
+
+@pytest.fixture
+def limiters(monkeypatch):
+    # Débit quasi nul : les seaux ne se reconstituent pas pendant le test
+    by_ip = ratelimit.TokenBucketLimiter(2, 1e-6)
+    by_username = ratelimit.TokenBucketLimiter(1, 1e-6)
+    monkeypatch.setattr(ratelimit, "by_ip", by_ip)
+    monkeypatch.setattr(ratelimit, "by_username", by_username)
+    return by_ip, by_username
+
+def test_rejected_request_consumes_no_token(limiters):
+    by_ip, by_username = limiters
+
+    assert ratelimit.check_auth_rate("login", "10.0.0.1", "alice") == 0
+    # Seau du nom d'utilisateur vide : le jeton de l'adresse n'est pas consommé
+    assert ratelimit.check_auth_rate("login", "10.0.0.1", "Alice") > 0
+    assert ratelimit.check_auth_rate("login", "10.0.0.1", "bob") == 0
+    assert ratelimit.check_auth_rate("login", "10.0.0.1", "carol") > 0
+    assert (by_ip.stats()["allowed"], by_ip.stats()["rejected"]) == (2, 1)
+    assert (by_username.stats()["allowed"], by_username.stats()["rejected"]) == (2, 1)
+
+def test_attempts_from_another_address_do_not_lock_out_the_account(limiters):
+    for _ in range(3):
+        ratelimit.check_auth_rate("login", "203.0.113.7", "alice")
+
+    assert ratelimit.check_auth_rate("login", "203.0.113.7", "alice") > 0
+    assert ratelimit.check_auth_rate("login", "10.0.0.1", "alice") == 0
@@ -0,0 +1,36 @@
+import pytest
+
+import crud
+import models
+import ratings
+from conftest import matches_by_name
+
+def _ratings(db):
+    db.expire_all()
+    teams = {team.id: team.rating for team in db.query(models.Team)}
+    players = {player.id: player.rating for player in db.query(models.Player)}
+    return teams, players
+
+def _score(db, tournament_id: int, name: str, team1_score: int, team2_score: int):
+    crud.update_match_score(db, matches_by_name(db, tournament_id)[name].id, team1_score, team2_score)
+
+def test_score_correction_matches_full_recompute(db, start_tournament):
+    tournament, teams = start_tournament(4, 4)
+    for team in teams:
+        db.add(models.Player(name=f"Joueur {team.id}", team_id=team.id))
+    db.commit()
+
+    _score(db, tournament.id, "round1-match1", 3, 1)
+    _score(db, tournament.id, "round1-match2", 3, 2)
+    _score(db, tournament.id, "round2-match1", 3, 0)
+    # Correction du premier tour : la finale déjà jouée est remise à jouer, puis rejouée
+    _score(db, tournament.id, "round1-match1", 1, 3)
+    _score(db, tournament.id, "round2-match1", 2, 3)
+
+    incremental = _ratings(db)
+    ratings.recompute_ratings(db)
+    recomputed = _ratings(db)
+
+    for current, expected in zip(incremental, recomputed):
+        assert current == pytest.approx(expected)
+    assert incremental[0] != {team.id: ratings.INITIAL_RATING for team in teams}
@@ -0,0 +1,29 @@
+import crud
+import models
+import stats
+from conftest import matches_by_name
+
+def _score(db, tournament_id: int, name: str, team1_score: int, team2_score: int):
+    crud.update_match_score(db, matches_by_name(db, tournament_id)[name].id, team1_score, team2_score)
+
+def test_counters_match_rebuild_after_correction_resets_played_match(db, start_tournament):
+    tournament, teams = start_tournament(4, 4)
+    for team in teams:
+        db.add(models.Player(name=f"Joueur {team.id}", team_id=team.id))
+        db.add(models.Player(name=f"Invité {team.id}", team_id=team.id, status="pending"))
+    db.commit()
+
+    _score(db, tournament.id, "round1-match1", 3, 1)
+    _score(db, tournament.id, "round1-match2", 3, 2)
+    _score(db, tournament.id, "round2-match1", 3, 0)
+    # Correction du premier tour : la finale déjà jouée est remise à jouer
+    _score(db, tournament.id, "round1-match1", 1, 3)
+    assert matches_by_name(db, tournament.id)["round2-match1"].team1_score is None
+
+    report = stats.rebuild_stats(db)
+    assert (report["teams_changed"], report["players_changed"]) == (0, 0)
+
+    _score(db, tournament.id, "round2-match1", 2, 3)
+    report = stats.rebuild_stats(db)
+    assert (report["teams_changed"], report["players_changed"]) == (0, 0)
+    assert report["matches"] == 3
@@ -21,25 +21,26 @@ function App() {
   const { user, logout, loading } = useAuth();
   const [unreadNotifications, setUnreadNotifications] = useState(0);
 
-  // Vérifier les notifications non lues
+  // Nombre de notifications non lues, envoyé par le serveur à la connexion puis à chaque changement
   useEffect(() => {
-    const checkNotifications = async () => {
-      if (!user) return;
-      
-      try {
-        const notifications = await notificationService.getUserNotifications(user.id);
-        const unread = notifications.filter(n => !n.is_read).length;
-        setUnreadNotifications(unread);
-      } catch (err) {
-        console.error('Erreur lors de la vérification des notifications:', err);
+    if (!user) return;
+
+    const closeEvents = notificationService.openNotificationEvents(
+      {
+        unread: (event) => setUnreadNotifications(JSON.parse(event.data).count)
+      },
+      async () => {
+        // Flux impossible à ouvrir (session expirée...) : afficher au moins le nombre courant
+        try {
+          const { count } = await notificationService.getUnreadCount(user.id);
+          setUnreadNotifications(count);
+        } catch (err) {
+          console.error('Erreur lors de la vérification des notifications:', err);
+        }
       }
-    };
+    );
 
-    checkNotifications();
-    
-    // Vérifier les notifications toutes les 60 secondes
-    const interval = setInterval(checkNotifications, 60000);
-    return () => clearInterval(interval);
+    return closeEvents;
   }, [user]);
 
   // Fonction pour protéger les routes
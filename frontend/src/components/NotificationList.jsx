@@ -2,8 +2,12 @@ import React, { useState, useEffect } from 'react';
 import { notificationService, teamService } from '../services/api';
 import { useAuth } from '../contexts/AuthContext';
 
+// Nombre de notifications chargées à la fois
+const NOTIFICATIONS_PAGE_SIZE = 20;
+
 const NotificationList = () => {
   const [notifications, setNotifications] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const { user } = useAuth();
@@ -14,8 +18,9 @@ const NotificationList = () => {
       
       try {
         setLoading(true);
-        const data = await notificationService.getUserNotifications(user.id);
-        setNotifications(data);
+        const page = await notificationService.getUserNotifications(user.id, { limit: NOTIFICATIONS_PAGE_SIZE });
+        setNotifications(page.items);
+        setNextCursor(page.next_cursor);
         setError(null);
       } catch (err) {
         console.error('Erreur lors de la récupération des notifications:', err);
@@ -26,12 +31,49 @@ const NotificationList = () => {
     };
 
     fetchNotifications();
+    if (!user) return;
     
-    // Rafraîchir les notifications toutes les 30 secondes
-    const interval = setInterval(fetchNotifications, 30000);
-    return () => clearInterval(interval);
+    // Les nouvelles notifications sont envoyées par le serveur dès leur création
+    return notificationService.openNotificationEvents({
+      notification: (event) => {
+        const notification = JSON.parse(event.data);
+        setNotifications((current) => [
+          notification,
+          ...current.filter((n) => n.id !== notification.id)
+        ]);
+      }
+    });
   }, [user]);
 
+  const loadMoreNotifications = async () => {
+    try {
+      const page = await notificationService.getUserNotifications(user.id, {
+        limit: NOTIFICATIONS_PAGE_SIZE,
+        cursor: nextCursor
+      });
+      // Une notification reçue entre-temps peut déjà être affichée
+      setNotifications(current => [
+        ...current,
+        ...page.items.filter(notification => !current.some(n => n.id === notification.id))
+      ]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error('Erreur lors de la récupération des notifications:', err);
+      setError('Impossible de charger les notifications');
+    }
+  };
+
+  const handleMarkAllAsRead = async () => {
+    try {
+      // Une seule requête pour toutes les notifications non lues
+      await notificationService.markNotificationsAsRead(user.id);
+      setNotifications(current => current.map(n => ({ ...n, is_read: true })));
+    } catch (err) {
+      console.error('Erreur lors du marquage des notifications comme lues:', err);
+      setError('Impossible de marquer les notifications comme lues');
+    }
+  };
+
   const handleAcceptInvitation = async (notification) => {
     try {
       const notificationData = JSON.parse(notification.data);
@@ -96,6 +138,16 @@ const NotificationList = () => {
 
   return (
     <div className="space-y-4">
+      {notifications.some(n => !n.is_read) && (
+        <div className="text-right">
+          <button
+            onClick={handleMarkAllAsRead}
+            className="text-sm text-blue-600 hover:text-blue-800"
+          >
+            Tout marquer comme lu
+          </button>
+        </div>
+      )}
       {notifications.map((notification) => (
         <div 
           key={notification.id} 
@@ -136,6 +188,16 @@ const NotificationList = () => {
           )}
         </div>
       ))}
+      {nextCursor && (
+        <div className="text-center">
+          <button
+            onClick={loadMoreNotifications}
+            className="px-4 py-2 text-sm text-gray-700 border border-gray-300 rounded-md hover:bg-gray-50"
+          >
+            Afficher plus de notifications
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1,6 +1,9 @@
 import { createContext, useState, useEffect, useContext } from 'react';
 import { authService, userService } from '../services/api';
 
+// Marge (ms) avant l'expiration du jeton d'accès pour le renouveler
+const REFRESH_MARGIN_MS = 60 * 1000;
+
 // Création du contexte d'authentification
 const AuthContext = createContext();
 
@@ -24,16 +27,8 @@ export const AuthProvider = ({ children }) => {
         throw new Error('Token invalide ou expiré');
       }
       
-      // Récupérer l'utilisateur par son nom d'utilisateur
-      const users = await userService.getUsers();
-      const userProfile = users.find(u => u.username === username);
-      
-      if (!userProfile) {
-        throw new Error('Utilisateur non trouvé');
-      }
-      
-      // Récupérer les détails complets de l'utilisateur
-      const fullProfile = await userService.getUserProfile(userProfile.id);
+      // Récupérer les détails complets de l'utilisateur connecté
+      const fullProfile = await userService.getCurrentUser();
       setUser(fullProfile);
     } catch (error) {
       console.error('Erreur lors du chargement du profil utilisateur:', error);
@@ -46,13 +41,56 @@ export const AuthProvider = ({ children }) => {
     }
   };
 
-  // Vérifier si l'utilisateur est connecté au chargement de l'application
+  // Vérifier si l'utilisateur est connecté au chargement de l'application.
+  // Un jeton d'accès expiré est renouvelé avec le jeton de rafraîchissement
   useEffect(() => {
-    if (authService.isAuthenticated()) {
-      loadUserInfo();
-    } else {
-      setLoading(false);
-    }
+    const init = async () => {
+      if (!authService.isAuthenticated() && authService.canRefresh()) {
+        try {
+          await authService.refresh();
+        } catch (error) {
+          console.error('Erreur lors du renouvellement de la session:', error);
+        }
+      }
+      if (authService.isAuthenticated()) {
+        loadUserInfo();
+      } else {
+        setLoading(false);
+      }
+    };
+    init();
+  }, []);
+
+  // Renouveler le jeton d'accès une minute avant son expiration
+  useEffect(() => {
+    if (!user || !authService.canRefresh()) return;
+
+    const timer = setTimeout(async () => {
+      try {
+        await authService.refresh();
+        // Nouvel objet : relance la programmation du prochain renouvellement
+        setUser((current) => current && { ...current });
+      } catch (error) {
+        console.error('Erreur lors du renouvellement de la session:', error);
+      }
+    }, Math.max(authService.getTokenTimeLeft() - REFRESH_MARGIN_MS, 0));
+    return () => clearTimeout(timer);
+  }, [user]);
+
+  // Jetons renouvelés ou supprimés par un autre onglet
+  useEffect(() => {
+    const handleStorage = (event) => {
+      if (event.key !== 'token') return;
+      if (event.newValue) {
+        // Nouvelle expiration : relance la programmation du renouvellement
+        setUser((current) => current && { ...current });
+      } else if (!authService.canRefresh()) {
+        // Déconnexion dans un autre onglet
+        setUser(null);
+      }
+    };
+    window.addEventListener('storage', handleStorage);
+    return () => window.removeEventListener('storage', handleStorage);
   }, []);
 
   // Fonction de connexion
@@ -33,12 +33,13 @@ function Profile() {
       const teamsData = await userService.getUserTeams(user.id);
       setUserTeams(teamsData);
 
-      // Charger les matchs de l'utilisateur
-      const matchesData = await userService.getUserMatches(user.id);
+      // Matchs à venir : première page des matchs sans score à partir d'aujourd'hui
+      const today = new Date().toISOString().slice(0, 10);
+      const pendingPage = await userService.getUserMatches(user.id, { result: 'pending', date_from: today });
       
       // Filtrer les matchs à venir (date future) et non terminés (sans score)
       const now = new Date();
-      const upcoming = matchesData.filter(match => {
+      const upcoming = pendingPage.items.filter(match => {
         // Vérifier si la date est dans le futur
         const isFutureDate = new Date(match.date) > now;
         
@@ -50,27 +51,12 @@ function Profile() {
       });
       setUpcomingMatches(upcoming);
 
-      // Calculer les statistiques
-      const victories = matchesData.filter(match => {
-        if (match.user_is_team1) {
-          return match.team1_score > match.team2_score;
-        } else {
-          return match.team2_score > match.team1_score;
-        }
-      }).length;
-
-      const pointsScored = matchesData.reduce((total, match) => {
-        if (match.user_is_team1) {
-          return total + (match.team1_score || 0);
-        } else {
-          return total + (match.team2_score || 0);
-        }
-      }, 0);
-
+      // Statistiques calculées par le serveur sur tout l'historique
+      const matchStats = await userService.getUserMatchStats(user.id);
       setStats({
-        victories,
-        matchesPlayed: matchesData.length,
-        pointsScored
+        victories: matchStats.victories,
+        matchesPlayed: matchStats.matches_played,
+        pointsScored: matchStats.points_scored
       });
 
     } catch (err) {
@@ -5,6 +5,7 @@ import { Link } from 'react-router-dom';
 function Scoreboard() {
   const [activeTab, setActiveTab] = useState('teams');
   const [teamRankings, setTeamRankings] = useState([]);
+  const [teamsCursor, setTeamsCursor] = useState(null);
   const [playerRankings, setPlayerRankings] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -22,8 +23,9 @@ function Scoreboard() {
         scoreboardService.getPlayerRankings()
       ]);
       
-      setTeamRankings(teamsData);
-      setPlayerRankings(playersData);
+      setTeamRankings(teamsData.items);
+      setTeamsCursor(teamsData.next_cursor);
+      setPlayerRankings(playersData.items);
     } catch (err) {
       console.error('Error fetching rankings:', err);
       setError('Impossible de charger les classements. Veuillez réessayer plus tard.');
@@ -32,6 +34,18 @@ function Scoreboard() {
     }
   };
 
+  // Charger la suite du classement des équipes
+  const loadMoreTeams = async () => {
+    try {
+      const page = await scoreboardService.getTeamRankings(teamsCursor);
+      setTeamRankings(prevRankings => [...prevRankings, ...page.items]);
+      setTeamsCursor(page.next_cursor);
+    } catch (err) {
+      console.error('Error fetching rankings:', err);
+      setError('Impossible de charger les classements. Veuillez réessayer plus tard.');
+    }
+  };
+
   // Fonction pour rendre le podium
   const renderPodium = (rankings, type) => {
     if (rankings.length < 3) return null;
@@ -208,6 +222,9 @@ function Scoreboard() {
                         <th scope="col" className="px-3 py-3.5 text-left text-sm font-semibold text-gray-900">
                           Tournois gagnés
                         </th>
+                        <th scope="col" className="px-3 py-3.5 text-left text-sm font-semibold text-gray-900">
+                          Elo
+                        </th>
                       </tr>
                     </thead>
                     <tbody className="divide-y divide-gray-200 bg-white">
@@ -219,10 +236,10 @@ function Scoreboard() {
                                 {index === 0 && <span className="text-yellow-500 text-lg mr-1">🥇</span>}
                                 {index === 1 && <span className="text-gray-400 text-lg mr-1">🥈</span>}
                                 {index === 2 && <span className="text-amber-700 text-lg mr-1">🥉</span>}
-                                {index + 1}
+                                {team.rank}
                               </span>
                             ) : (
-                              index + 1
+                              team.rank
                             )}
                           </td>
                           <td className="whitespace-nowrap px-3 py-4 text-sm">
@@ -251,12 +268,26 @@ function Scoreboard() {
                               team.tournaments_won
                             )}
                           </td>
+                          <td className="whitespace-nowrap px-3 py-4 text-sm font-medium text-gray-900">
+                            {Math.round(team.rating)}
+                          </td>
                         </tr>
                       ))}
                     </tbody>
                   </table>
                 )}
               </div>
+              {teamsCursor && (
+                <div className="mt-6 text-center">
+                  <button
+                    type="button"
+                    onClick={loadMoreTeams}
+                    className="inline-flex items-center rounded-md border border-gray-300 bg-white px-4 py-2 text-sm font-medium text-gray-700 shadow-sm hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2"
+                  >
+                    Afficher la suite du classement
+                  </button>
+                </div>
+              )}
             </>
           ) : (
             <>
@@ -280,6 +311,9 @@ function Scoreboard() {
                         <th scope="col" className="px-3 py-3.5 text-left text-sm font-semibold text-gray-900">
                           Victoires
                         </th>
+                        <th scope="col" className="px-3 py-3.5 text-left text-sm font-semibold text-gray-900">
+                          Elo
+                        </th>
                       </tr>
                     </thead>
                     <tbody className="divide-y divide-gray-200 bg-white">
@@ -291,10 +325,10 @@ function Scoreboard() {
                                 {index === 0 && <span className="text-yellow-500 text-lg mr-1">🥇</span>}
                                 {index === 1 && <span className="text-gray-400 text-lg mr-1">🥈</span>}
                                 {index === 2 && <span className="text-amber-700 text-lg mr-1">🥉</span>}
-                                {index + 1}
+                                {player.rank}
                               </span>
                             ) : (
-                              index + 1
+                              player.rank
                             )}
                           </td>
                           <td className="whitespace-nowrap px-3 py-4 text-sm">
@@ -308,6 +342,9 @@ function Scoreboard() {
                           <td className="whitespace-nowrap px-3 py-4 text-sm font-medium text-green-600">
                             {player.wins}
                           </td>
+                          <td className="whitespace-nowrap px-3 py-4 text-sm font-medium text-gray-900">
+                            {Math.round(player.rating)}
+                          </td>
                         </tr>
                       ))}
                     </tbody>
@@ -51,8 +51,8 @@ function TeamProfile() {
 
         // Récupérer les matchs de l'équipe
         try {
-          const matchesData = await teamService.getTeamMatches(teamId);
-          setMatches(matchesData);
+          const matchesPage = await teamService.getTeamMatches(teamId, { limit: 5 });
+          setMatches(matchesPage.items);
 
           // Utiliser directement les statistiques de l'équipe pour garantir la cohérence
           const tournamentsWon = teamData.tournaments_won || 0;
@@ -5,6 +5,7 @@ import { Link } from 'react-router-dom';
 
 function Teams() {
   const [teams, setTeams] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const { user } = useAuth();
@@ -24,13 +25,14 @@ function Teams() {
     setLoading(true);
     setError(null);
     try {
-      let fetchedTeams;
       if (viewMode === 'mine' && user) {
-        fetchedTeams = await userService.getUserTeams(user.id);
+        setTeams(await userService.getUserTeams(user.id));
+        setNextCursor(null);
       } else {
-        fetchedTeams = await teamService.getTeams();
+        const page = await teamService.getTeams();
+        setTeams(page.items);
+        setNextCursor(page.next_cursor);
       }
-      setTeams(fetchedTeams);
     } catch (err) {
       console.error('Error fetching teams:', err);
       setError('Impossible de charger les équipes. Veuillez réessayer plus tard.');
@@ -39,6 +41,22 @@ function Teams() {
     }
   };
 
+  // Charger la page suivante des équipes
+  const loadMoreTeams = async () => {
+    try {
+      const page = await teamService.getTeams(nextCursor);
+      // Une équipe créée entre-temps peut déjà être affichée
+      setTeams(prevTeams => [
+        ...prevTeams,
+        ...page.items.filter(team => !prevTeams.some(t => t.id === team.id))
+      ]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error('Error fetching teams:', err);
+      setError('Impossible de charger les équipes. Veuillez réessayer plus tard.');
+    }
+  };
+
   // Filtrer les équipes selon le mode d'affichage
   const filteredTeams = teams;
 
@@ -381,6 +399,17 @@ function Teams() {
                 </div>
               ))}
             </div>
+            {nextCursor && (
+              <div className="mt-6 text-center">
+                <button
+                  type="button"
+                  onClick={loadMoreTeams}
+                  className="inline-flex items-center rounded-md border border-gray-300 bg-white px-4 py-2 text-sm font-medium text-gray-700 shadow-sm hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2"
+                >
+                  Afficher plus d'équipes
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { tournamentService } from '../services/api';
@@ -15,11 +15,52 @@ function TournamentDetails() {
   const [refreshing, setRefreshing] = useState(false);
   const [error, setError] = useState(null);
   const { user } = useAuth();
+  // Version du tournoi affiché, comparée à celle annoncée par le flux en direct
+  const versionRef = useRef(null);
 
   useEffect(() => {
     fetchTournament();
   }, [id]);
 
+  // Mises à jour en direct : les scores saisis par l'organisateur arrivent sans recharger
+  useEffect(() => {
+    const events = tournamentService.openTournamentEvents(parseInt(id));
+
+    events.addEventListener('sync', (event) => {
+      // À la (re)connexion : recharger si des modifications ont été manquées
+      const data = JSON.parse(event.data);
+      if (versionRef.current !== null && data.version !== versionRef.current) {
+        refreshTournament();
+      }
+    });
+    const onUpdate = (event) => applyTournamentUpdate(JSON.parse(event.data));
+    events.addEventListener('matches', onUpdate);
+    events.addEventListener('tournament', onUpdate);
+
+    return () => events.close();
+  }, [id]);
+
+  // Remplace les matchs modifiés (et le statut s'il est fourni) sans recharger le tournoi
+  const applyTournamentUpdate = (data) => {
+    if (data.version !== undefined) {
+      versionRef.current = data.version;
+    }
+    setTournament((current) => {
+      if (!current) return current;
+      const updated = { ...current };
+      if (data.version !== undefined) updated.version = data.version;
+      if (data.status) updated.status = data.status;
+      if (data.matches) {
+        const matchesById = new Map((current.matches || []).map((match) => [match.id, match]));
+        data.matches.forEach((match) => matchesById.set(match.id, match));
+        updated.matches = [...matchesById.values()].sort(
+          (a, b) => a.round - b.round || a.match_number - b.match_number
+        );
+      }
+      return updated;
+    });
+  };
+
   const fetchTournament = async () => {
     if (!refreshing) setLoading(true);
     else setRefreshing(true);
@@ -42,6 +83,7 @@ function TournamentDetails() {
         tournamentData.matches = [];
       }
       
+      versionRef.current = tournamentData.version;
       setTournament(tournamentData);
     } catch (err) {
       console.error('Error fetching tournament:', err);
@@ -124,10 +166,8 @@ function TournamentDetails() {
       const result = await tournamentService.startTournament(tournament.id);
       console.log("Tournoi démarré avec succès:", result);
       
-      // Attendre un court instant pour permettre au backend de traiter les données
-      setTimeout(() => {
-        fetchTournament(); // Recharger les données du tournoi
-      }, 1000);
+      // Afficher directement le tableau créé, avec le statut et la version renvoyés par le serveur
+      applyTournamentUpdate({ status: result.status, version: result.version, matches: result.matches });
     } catch (err) {
       console.error('Error starting tournament:', err);
       setError(`Erreur lors du démarrage du tournoi: ${err.message || 'Erreur inconnue'}`);
@@ -153,9 +193,9 @@ function TournamentDetails() {
   const handleUpdateScore = async (matchId, team1Score, team2Score) => {
     try {
       setError(null);
-      await tournamentService.updateMatchScore(matchId, team1Score, team2Score);
-      // Recharger les données complètes du tournoi, y compris les matchs mis à jour
-      await fetchTournament();
+      const result = await tournamentService.updateMatchScore(matchId, team1Score, team2Score);
+      // Remplacer uniquement les matchs modifiés par le score (propagation comprise)
+      applyTournamentUpdate({ matches: result.updated_matches });
       // Afficher un message de succès temporaire
       const successMessage = document.createElement('div');
       successMessage.className = 'fixed top-4 right-4 bg-green-100 border border-green-400 text-green-700 px-4 py-3 rounded z-50';
@@ -5,6 +5,7 @@ import { tournamentService, teamService, userService } from '../services/api';
 
 function Tournaments() {
   const [tournaments, setTournaments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [userTeams, setUserTeams] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -21,8 +22,9 @@ function Tournaments() {
   const fetchTournaments = async () => {
     setLoading(true);
     try {
-      const data = await tournamentService.getTournaments();
-      setTournaments(data);
+      const page = await tournamentService.getTournaments();
+      setTournaments(page.items);
+      setNextCursor(page.next_cursor);
     } catch (err) {
       console.error('Error fetching tournaments:', err);
       setError('Impossible de charger les tournois. Veuillez réessayer plus tard.');
@@ -31,6 +33,18 @@ function Tournaments() {
     }
   };
 
+  // Charger la page suivante des tournois
+  const loadMoreTournaments = async () => {
+    try {
+      const page = await tournamentService.getTournaments(nextCursor);
+      setTournaments(prevTournaments => [...prevTournaments, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error('Error fetching tournaments:', err);
+      setError('Impossible de charger les tournois. Veuillez réessayer plus tard.');
+    }
+  };
+
   const fetchUserTeams = async () => {
     if (!user) return;
     
@@ -51,10 +65,9 @@ function Tournaments() {
       // Mettre à jour l'état local
       setTournaments(tournaments.map(tournament => {
         if (tournament.id === tournamentId) {
-          const selectedTeamObj = userTeams.find(team => team.id === parseInt(selectedTeam));
           return {
             ...tournament,
-            teams: [...tournament.teams, selectedTeamObj],
+            team_count: tournament.team_count + 1,
           };
         }
         return tournament;
@@ -180,9 +193,14 @@ function Tournaments() {
                           <span className={`inline-flex rounded-full px-2 text-xs font-semibold leading-5 ${getStatusBadgeColor(tournament.status)}`}>
                             {getStatusText(tournament.status)}
                           </span>
+                          {tournament.winner_name && (
+                            <span className="ml-2 text-xs text-gray-500">
+                              Vainqueur : {tournament.winner_name}
+                            </span>
+                          )}
                         </td>
                         <td className="whitespace-nowrap px-3 py-4 text-sm text-gray-500">
-                          {tournament.teams.length} / {tournament.max_teams} équipes
+                          {tournament.team_count} / {tournament.max_teams} équipes
                         </td>
                         <td className="relative whitespace-nowrap py-4 pl-3 pr-4 text-right text-sm font-medium sm:pr-6">
                           {tournament.status === 'open' && user && (
@@ -221,6 +239,18 @@ function Tournaments() {
           </div>
         </div>
       </div>
+
+      {nextCursor && (
+        <div className="mt-6 text-center">
+          <button
+            type="button"
+            onClick={loadMoreTournaments}
+            className="inline-flex items-center rounded-md border border-gray-300 bg-white px-4 py-2 text-sm font-medium text-gray-700 shadow-sm hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2"
+          >
+            Afficher plus de tournois
+          </button>
+        </div>
+      )}
     </div>
   );
 }
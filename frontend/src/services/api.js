@@ -1,6 +1,9 @@
 // URL de base de l'API
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
 
+// Délai (ms) avant de rouvrir un flux de notifications coupé
+const NOTIFICATION_EVENTS_RETRY_MS = 3000;
+
 // Fonction utilitaire pour gérer les erreurs de fetch
 const handleResponse = async (response) => {
   if (!response.ok) {
@@ -36,6 +39,15 @@ const handleResponse = async (response) => {
   return response.json();
 };
 
+// Paramètres de filtre et de pagination des listes (les valeurs vides sont ignorées).
+// cursor est le next_cursor renvoyé par la page précédente
+const listQuery = (params = {}) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== null && value !== undefined && value !== '')
+  ).toString();
+  return query ? `?${query}` : '';
+};
+
 // Fonction pour obtenir les headers avec le token d'authentification
 const getAuthHeaders = () => {
   const token = localStorage.getItem('token');
@@ -77,6 +89,23 @@ const isTokenExpired = () => {
   return currentTime >= expirationTime;
 };
 
+// Enregistre les jetons renvoyés par la connexion ou le rafraîchissement
+const storeTokens = (data) => {
+  if (data.access_token) {
+    localStorage.setItem('token', data.access_token);
+  }
+  if (data.refresh_token) {
+    localStorage.setItem('refreshToken', data.refresh_token);
+  }
+};
+
+// Les onglets partagent les jetons (localStorage) : un seul à la fois échange le
+// jeton de rafraîchissement, les autres attendent le verrou puis reprennent les
+// jetons qu'il a enregistrés. Sans l'API Web Locks, le délai de grâce du serveur
+// couvre les échanges simultanés
+const withRefreshLock = (callback) =>
+  navigator.locks ? navigator.locks.request('auth-refresh', callback) : callback();
+
 // Service d'authentification
 export const authService = {
   // Inscription d'un nouvel utilisateur
@@ -102,15 +131,65 @@ export const authService = {
     });
 
     const data = await handleResponse(response);
-    if (data.access_token) {
-      localStorage.setItem('token', data.access_token);
-    }
+    storeTokens(data);
     return data;
   },
 
-  // Déconnexion
+  // Nouveau jeton d'accès à partir du jeton de rafraîchissement (sans mot de passe).
+  // Le jeton de rafraîchissement est remplacé à chaque appel
+  refresh: async () => {
+    const previousToken = localStorage.getItem('refreshToken');
+    if (!previousToken) {
+      throw new Error('Aucun jeton de rafraîchissement');
+    }
+
+    return withRefreshLock(async () => {
+      const refreshToken = localStorage.getItem('refreshToken');
+      if (!refreshToken) {
+        throw new Error('Aucun jeton de rafraîchissement');
+      }
+      // Un autre onglet a renouvelé la session pendant l'attente du verrou
+      if (refreshToken !== previousToken && authService.isAuthenticated()) {
+        return { access_token: localStorage.getItem('token'), token_type: 'bearer', refresh_token: refreshToken };
+      }
+
+      const response = await fetch(`${API_URL}/auth/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      });
+
+      if (response.status === 401) {
+        localStorage.removeItem('refreshToken');
+      }
+      const data = await handleResponse(response);
+      storeTokens(data);
+      return data;
+    });
+  },
+
+  // Indique si la session peut être prolongée sans mot de passe
+  canRefresh: () => !!localStorage.getItem('refreshToken'),
+
+  // Délai (ms) avant l'expiration du jeton d'accès
+  getTokenTimeLeft: () => {
+    const decoded = decodeToken();
+    if (!decoded || !decoded.exp) return 0;
+    return decoded.exp * 1000 - Date.now();
+  },
+
+  // Déconnexion (le jeton de rafraîchissement est révoqué côté serveur)
   logout: () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (refreshToken) {
+      fetch(`${API_URL}/auth/logout`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      }).catch((error) => console.error('Erreur lors de la déconnexion:', error));
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
   },
 
   // Vérifier si l'utilisateur est connecté
@@ -143,9 +222,9 @@ export const authService = {
 
 // Service pour les équipes
 export const teamService = {
-  // Récupérer toutes les équipes
-  getTeams: async () => {
-    const response = await fetch(`${API_URL}/teams`, {
+  // Récupérer une page d'équipes ({ items, next_cursor })
+  getTeams: async (cursor = null) => {
+    const response = await fetch(`${API_URL}/teams${listQuery({ cursor })}`, {
       headers: getAuthHeaders()
     });
     return handleResponse(response);
@@ -286,8 +365,9 @@ export const teamService = {
   },
 
   // Récupérer les matchs d'une équipe
-  getTeamMatches: async (teamId) => {
-    const response = await fetch(`${API_URL}/teams/${teamId}/matches`, {
+  // params : tournament_id, date_from, date_to, result ('win', 'loss', 'pending'), cursor, limit
+  getTeamMatches: async (teamId, params = {}) => {
+    const response = await fetch(`${API_URL}/teams/${teamId}/matches${listQuery(params)}`, {
       headers: getAuthHeaders()
     });
     return handleResponse(response);
@@ -296,9 +376,9 @@ export const teamService = {
 
 // Service pour les tournois
 export const tournamentService = {
-  // Récupérer tous les tournois
-  getTournaments: async () => {
-    const response = await fetch(`${API_URL}/tournaments`, {
+  // Récupérer une page de tournois ({ items, next_cursor })
+  getTournaments: async (cursor = null) => {
+    const response = await fetch(`${API_URL}/tournaments${listQuery({ cursor })}`, {
       headers: getAuthHeaders()
     });
     return handleResponse(response);
@@ -393,6 +473,12 @@ export const tournamentService = {
     return handleResponse(response);
   },
 
+  // Flux des modifications d'un tournoi en temps réel (Server-Sent Events) :
+  // événements "sync" (version courante), "matches" et "tournament"
+  openTournamentEvents: (tournamentId) => {
+    return new EventSource(`${API_URL}/tournaments/${tournamentId}/events`);
+  },
+
   // Mettre à jour le score d'un match
   updateMatchScore: async (matchId, team1Score, team2Score) => {
     const response = await fetch(`${API_URL}/matches/${matchId}`, {
@@ -406,15 +492,15 @@ export const tournamentService = {
 
 // Service pour le classement
 export const scoreboardService = {
-  // Récupérer le classement des équipes
-  getTeamRankings: async () => {
-    const response = await fetch(`${API_URL}/scoreboard/teams`, {
+  // Récupérer une page du classement des équipes ({ items, next_cursor })
+  getTeamRankings: async (cursor = null) => {
+    const response = await fetch(`${API_URL}/scoreboard/teams${listQuery({ cursor })}`, {
       headers: getAuthHeaders()
     });
     return handleResponse(response);
   },
 
-  // Récupérer le classement des joueurs
+  // Récupérer le classement des joueurs (les 10 premiers)
   getPlayerRankings: async () => {
     const response = await fetch(`${API_URL}/scoreboard/players`, {
       headers: getAuthHeaders()
@@ -433,17 +519,34 @@ export const userService = {
     return handleResponse(response);
   },
 
-  // Récupérer tous les utilisateurs
-  getUsers: async () => {
-    const response = await fetch(`${API_URL}/users`, {
+  // Récupérer une page d'utilisateurs ({ items, next_cursor })
+  getUsers: async (cursor = null) => {
+    const response = await fetch(`${API_URL}/users${listQuery({ cursor })}`, {
+      headers: getAuthHeaders()
+    });
+    return handleResponse(response);
+  },
+
+  // Récupérer le profil de l'utilisateur connecté
+  getCurrentUser: async () => {
+    const response = await fetch(`${API_URL}/users/me`, {
       headers: getAuthHeaders()
     });
     return handleResponse(response);
   },
 
   // Récupérer les matchs d'un utilisateur
-  getUserMatches: async (userId) => {
-    const response = await fetch(`${API_URL}/users/${userId}/matches`, {
+  // params : tournament_id, date_from, date_to, result ('win', 'loss', 'pending'), cursor, limit
+  getUserMatches: async (userId, params = {}) => {
+    const response = await fetch(`${API_URL}/users/${userId}/matches${listQuery(params)}`, {
+      headers: getAuthHeaders()
+    });
+    return handleResponse(response);
+  },
+
+  // Totaux des matchs d'un utilisateur ({ matches_played, victories, points_scored })
+  getUserMatchStats: async (userId) => {
+    const response = await fetch(`${API_URL}/users/${userId}/match-stats`, {
       headers: getAuthHeaders()
     });
     return handleResponse(response);
@@ -470,14 +573,76 @@ export const userService = {
 
 // Service pour les notifications
 export const notificationService = {
-  // Récupérer les notifications d'un utilisateur
-  getUserNotifications: async (userId) => {
-    const response = await fetch(`${API_URL}/users/${userId}/notifications`, {
+  // Récupérer une page de notifications, les plus récentes d'abord ({ items, next_cursor }).
+  // params : { unread_only, limit, cursor }
+  getUserNotifications: async (userId, params = {}) => {
+    const response = await fetch(`${API_URL}/users/${userId}/notifications${listQuery(params)}`, {
       headers: getAuthHeaders()
     });
     return handleResponse(response);
   },
 
+  // Marquer comme lues plusieurs notifications (toutes si ids est absent) ({ updated })
+  markNotificationsAsRead: async (userId, ids = null) => {
+    const response = await fetch(`${API_URL}/users/${userId}/notifications/read`, {
+      method: 'PUT',
+      headers: getAuthHeaders(),
+      body: JSON.stringify(ids ? { ids } : {})
+    });
+    return handleResponse(response);
+  },
+
+  // Nombre de notifications non lues d'un utilisateur ({ count })
+  getUnreadCount: async (userId) => {
+    const response = await fetch(`${API_URL}/users/${userId}/notifications/unread-count`, {
+      headers: getAuthHeaders()
+    });
+    return handleResponse(response);
+  },
+
+  // Flux des notifications de l'utilisateur connecté (Server-Sent Events) :
+  // événements "unread" ({ count }) et "notification" (nouvelle notification).
+  // listeners associe un type d'événement à sa fonction ; onStopped est appelé si
+  // le flux ne peut plus être ouvert (session expirée...). Renvoie la fonction
+  // qui ferme le flux.
+  // EventSource ne peut pas envoyer d'en-têtes : chaque connexion est ouverte avec
+  // un ticket à usage unique, jamais avec le jeton d'accès dans l'URL
+  openNotificationEvents: (listeners, onStopped = () => {}) => {
+    let events = null;
+    let retryTimer = null;
+    let closed = false;
+
+    const connect = async () => {
+      let ticket;
+      try {
+        const response = await fetch(`${API_URL}/notifications/events/ticket`, {
+          method: 'POST',
+          headers: getAuthHeaders()
+        });
+        ({ ticket } = await handleResponse(response));
+      } catch (error) {
+        if (!closed) onStopped(error);
+        return;
+      }
+      if (closed) return;
+
+      events = new EventSource(`${API_URL}/notifications/events?ticket=${encodeURIComponent(ticket)}`);
+      Object.entries(listeners).forEach(([type, listener]) => events.addEventListener(type, listener));
+      events.onerror = () => {
+        // Le ticket est déjà utilisé : la reconnexion automatique échouerait
+        events.close();
+        if (!closed) retryTimer = setTimeout(connect, NOTIFICATION_EVENTS_RETRY_MS);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (events) events.close();
+    };
+  },
+
   // Marquer une notification comme lue
   markNotificationAsRead: async (notificationId) => {
     const response = await fetch(`${API_URL}/notifications/${notificationId}/read`, {